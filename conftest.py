@@ -17,6 +17,8 @@ pytest_plugins = "untitled_api.libs.django_utils.testing.utils"
 # .html#control-skipping-of-tests-according-to-command-line-option
 def pytest_addoption(parser):
   parser.addoption("--test-type", default='unit', help="run specific test type (unit, integration, etc.)")
+  parser.addoption("--update-benchmark-baseline", action="store_true", default=False,
+                   help="record benchmark results as the new baseline instead of comparing against it")
 
 
 def pytest_runtest_setup(item):
@@ -5,11 +5,13 @@ from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator
 from django.utils import timezone
+from django.utils.functional import cached_property
 
 from jsonfield import JSONField
 from django.db import models
 from jsonfield.fields import JSONFormFieldBase
 from untitled_api.libs.communication_utils.exceptions import EmailParseError
+from untitled_api.libs.communication_utils.parsing import header_parser
 from untitled_api.libs.datetime_utils.parsers import datetime_parser
 
 
@@ -60,8 +62,7 @@ class Email(models.Model):
     field_names = cls._meta.get_all_field_names()
     ret_val = cls(**{k:v for k, v in list(kwargs.items()) if k in field_names})
 
-    message = message_from_string(ret_val.headers)
-    message_dict = {t[0].lower(): t[1] for t in list(message.items())}
+    message_dict = header_parser.get_headers(ret_val.headers, ('message-id', 'in-reply-to', 'date'))
 
     #this field is not always required
     ret_val.in_reply_to_message_id = message_dict.get('in-reply-to')
@@ -74,6 +75,11 @@ class Email(models.Model):
 
     return ret_val
 
+  @cached_property
+  def parsed_headers(self):
+    """The full email.message.Message for the raw headers, only parsed when something asks for it."""
+    return message_from_string(self.headers or '')
+
   def save(self, internal=False, *args, **kwargs):
     if internal:
       super(Email, self).save(*args, **kwargs)
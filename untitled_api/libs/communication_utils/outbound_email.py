@@ -0,0 +1,4 @@
+from collections import namedtuple
+
+#associated_model is the model the sent Email gets attached to, the same as email_service.send_email
+OutboundEmail = namedtuple('OutboundEmail', 'from_address from_name to_address subject plain_text_body associated_model')
@@ -1,3 +1,5 @@
+from collections import namedtuple
+from multiprocessing import Pool
 import re
 import logging
 from untitled_api.libs.text_utils.formatting.text_formatter import unescape, despacify, decodeJs
@@ -8,9 +10,52 @@ specific_phone_number_pattern = re.compile(
 vague_phone_number_pattern = re.compile(
   r'(1[\W_]*)?(?P<proto_phone_number>[2-9][\W_]*(?:\d[\W_]*){8}\d)'
 )
+url_pattern = re.compile(r'https?://\S*')
+
+tag_pattern = re.compile(r'<[^>]+>')
+period_pattern = re.compile(r'\b\.\s')
+# Same matches as r'[^A-Z0-9\-]*\.[^A-Z0-9\-]*|\W+dot\W+|\W+d0t\W+'. Every match starts with a character from
+# [^A-Z0-9], so that character is matched first and the regex engine can skip ahead to candidates instead of trying
+# the leading star at every position.
+dot_pattern = re.compile(
+  r'[^A-Z0-9](?:(?<=\.)[^A-Z0-9\-]*|(?<!-)[^A-Z0-9\-.]*\.[^A-Z0-9\-]*|(?<=\W)\W*d[o0]t\W+)', re.IGNORECASE
+)
+upper_dot_pattern = re.compile(r'([a-z0-9])DOT([a-z0-9])')
+lower_dot_pattern = re.compile(r'([A-Z0-9])dot([A-Z0-9])')
+# same matches as r'\W*@\W*|\W+at\W+', starting from a \W character for the same reason as dot_pattern
+at_pattern = re.compile(r'\W(?:(?<=@)\W*|[^\w@]*@\W*|\W*at\W+)', re.IGNORECASE)
+upper_at_pattern = re.compile(r'([a-z0-9])AT([a-z0-9])')
+lower_at_pattern = re.compile(r'([A-Z0-9])at([A-Z0-9])')
+nospam_pattern = re.compile(r'[_\W]*n[_\W]*(o|0)[_\W]*(s|5)[_\W]*p[_\W]*a[_\W]*m[_\W]*', re.IGNORECASE)
+# every nospam_pattern match contains one of these, and this one can't backtrack over leading punctuation
+nospam_prefilter_pattern = re.compile(r'n[_\W]*[o0][_\W]*[s5][_\W]*p[_\W]*a[_\W]*m', re.IGNORECASE)
+# a contact name is the capitalized word or two after one of these cues, like "ask for Maria" or "Call Jane Doe"
+contact_name_pattern = (
+  r'\b(?:[Cc]ontact|[Cc]all|[Tt]ext|[Ee]mail|[Aa]sk for)\s+(?P<name>[A-Z][a-z]+(?: [A-Z][a-z]+)?)\b'
+)
+contact_name_stop_words = frozenset((
+  'Us', 'Me', 'Now', 'Today', 'Anytime', 'Our', 'The', 'For', 'To', 'At', 'Or', 'And', 'Broker', 'Agent', 'Owner',
+  'Office', 'Management', 'Leasing', 'Super', 'Landlord',
+))
+# urls, phone numbers and contact names in one left to right scan. The alternatives are tried in this order at each
+# position, so a url swallows any digits in it and a specific phone number wins over a vague one. A vague match is
+# only looked ahead at, so one starting at a stray digit like the 4 of "apt 4 212 555 1234" doesn't swallow the
+# specific number after it.
+contact_token_pattern = re.compile('|'.join((
+  r'(?P<url>https?://\S*)',
+  r'(?P<specific_phone_number>{0})'.format(specific_phone_number_pattern.pattern),
+  r'(?=(?P<vague_phone_number>{0}))'.format(vague_phone_number_pattern.pattern),
+  contact_name_pattern,
+)))
+email_address_pattern = re.compile(
+  r'\b[A-Z0-9\._\-]+@[A-Z0-9\.\-]+\.(?:[A-Z]{2}|com|org|net|edu|gov|mil|biz|info|mobi|name|aero|asia|jobs|museum)\b',
+  re.IGNORECASE
+)
 
 logger = logging.getLogger(__name__)
 
+Contact = namedtuple('Contact', 'name phone_number email_address')
+
 
 def get_contact_name(contact_name_str):
   ret_val = contact_name_str.strip()
@@ -21,77 +66,165 @@ def get_contact_phone_number(phone_number_str):
   phone_number = None
 
   # Filter out potentially confounding artifacts in the text, like links.
-  filtered_text = re.sub(r'https?://\S*', '--url--', phone_number_str)
+  filtered_text = url_pattern.sub('--url--', phone_number_str) if 'http' in phone_number_str else phone_number_str
 
   try:
-    # Old way of finding phone numbers.
-    old_phone_number_components = specific_phone_number_pattern.search(filtered_text)
-    if old_phone_number_components:
-      phone_number = "({0}) {1}-{2}".format(old_phone_number_components.group('area_code'),
-                                             old_phone_number_components.group('exchange'),
-                                             old_phone_number_components.group('number'))
-    else:
-      # New way of finding phone numbers.
-      new_phone_number_components = vague_phone_number_pattern.search(filtered_text)
-      if new_phone_number_components:
-        phone_number = "({0}{1}{2}) {3}{4}{5}-{6}{7}{8}{9}".format(
-          *(x for x in new_phone_number_components.group('proto_phone_number') if x.isalnum()))
+    # every specific match is also a vague match, so one vague scan rules out texts without a phone number and tells
+    # us where the specific scan can start
+    new_phone_number_components = vague_phone_number_pattern.search(filtered_text)
+    if new_phone_number_components:
+      # Old way of finding phone numbers.
+      old_phone_number_components = specific_phone_number_pattern.search(
+        filtered_text, new_phone_number_components.start()
+      )
+      # New way of finding phone numbers is the fallback.
+      phone_number = _format_phone_number(old_phone_number_components or new_phone_number_components)
   except:
     logger.warn("Error parsing phone number: {0}".format(phone_number_str), exc_info=1)
 
   return phone_number
 
 
+def _format_phone_number(phone_number_components):
+  if phone_number_components.groupdict().get('area_code'):
+    return "({0}) {1}-{2}".format(phone_number_components.group('area_code'),
+                                  phone_number_components.group('exchange'),
+                                  phone_number_components.group('number'))
+
+  return "({0}{1}{2}) {3}{4}{5}-{6}{7}{8}{9}".format(
+    *(x for x in phone_number_components.group('proto_phone_number') if x.isalnum()))
+
+
 def get_contact_email_address(contact_email_address_str):
   email_address = None
   # Adapted from http://jasonpriem.org/obfuscation-decoder/.
+  # Each step only runs when the text can contain what it rewrites, most listing bodies skip the bulk of them.
+  text = contact_email_address_str
+
   # decode html entities
-  text = unescape(contact_email_address_str)
+  if '&' in text:
+    text = unescape(text)
 
   # remove tags
   # This unfortunately removes <a href="mailto:xyz@abc.com">
-  text = re.sub(r'<[^>]+>', r'', text)
+  if '<' in text:
+    text = tag_pattern.sub('', text)
 
   # mark all periods as periods, so that they don't look like dots
-  text = re.sub(r'\b\.\s', '[PERIOD] ', text)
+  if '.' in text:
+    text = period_pattern.sub('[PERIOD] ', text)
 
   # despacify text
   text = despacify(text)
 
   # find the "dot"
-  text = re.sub(r'[^A-Z0-9\-]*\.[^A-Z0-9\-]*|\W+dot\W+|\W+d0t\W+', r'.', text, flags=re.IGNORECASE)
-  text = re.sub(r'([a-z0-9])DOT([a-z0-9])', r'\1.\2', text)
-  text = re.sub(r'([A-Z0-9])dot([A-Z0-9])', r'\1.\2', text)
+  lowered_text = text.lower()
+  if '.' in text or 'dot' in lowered_text or 'd0t' in lowered_text:
+    text = dot_pattern.sub('.', text)
+  if 'DOT' in text:
+    text = upper_dot_pattern.sub(r'\1.\2', text)
+  if 'dot' in text:
+    text = lower_dot_pattern.sub(r'\1.\2', text)
 
   # find the "at"
-  text = re.sub(r'\W*@\W*|\W+at\W+', r'@', text, flags=re.IGNORECASE)
-  text = re.sub(r'([a-z0-9])AT([a-z0-9])', r'\1@\2', text)
-  text = re.sub(r'([A-Z0-9])at([A-Z0-9])', r'\1@\2', text)
+  if '@' in text or 'at' in text.lower():
+    text = at_pattern.sub('@', text)
+  if 'AT' in text:
+    text = upper_at_pattern.sub(r'\1@\2', text)
+  if 'at' in text:
+    text = lower_at_pattern.sub(r'\1@\2', text)
 
   # get rid of obfuscating phrases; if the offending phrase includes the "at" or "dot," we have to put that back
-  text = re.sub(r'[_\W]*n[_\W]*(o|0)[_\W]*(s|5)[_\W]*p[_\W]*a[_\W]*m[_\W]*', _deobfuscate_phrase, text,
-                flags=re.IGNORECASE)
+  # the full pattern backtracks over every run of punctuation, so only run it when the phrase is actually there
+  if nospam_prefilter_pattern.search(text):
+    text = nospam_pattern.sub(_deobfuscate_phrase, text)
 
   # decode simple javascript fromCharCode obfuscations
-  text = decodeJs(text)
+  if 'fromCharCode' in text:
+    text = decodeJs(text)
 
   # pull out the now-standardized email address and return it
-  try:
-    email_address = re.compile(
-      r'\b[A-Z0-9\._\-]+@[A-Z0-9\.\-]+\.(?:[A-Z]{'
-      r'2}|com|org|net|edu|gov|mil|biz|info|mobi|name|aero|asia|jobs|museum)\b',
-
-      flags=re.IGNORECASE).search(text).group(0)
+  email_address_match = email_address_pattern.search(text) if '@' in text else None
+  if email_address_match:
+    email_address = email_address_match.group(0)
     if 'www.' in email_address:
       # This handles the highly unusual case where the text reads: "Find your next apartment at www.dwellee.com."
       # That would parse to apartment@www.dwellee.com.
       email_address = None
-  except:
-    logger.warn("Error parsing email: {0}".format(contact_email_address_str), exc_info=1)
 
   return email_address
 
 
+def get_contact_email_addresses(contact_email_address_strs):
+  """Batch version of get_contact_email_address. Listing bodies repeat a lot, so each distinct one is parsed once."""
+  email_addresses = {}
+  ret_val = []
+
+  for contact_email_address_str in contact_email_address_strs:
+    if contact_email_address_str not in email_addresses:
+      email_addresses[contact_email_address_str] = get_contact_email_address(contact_email_address_str)
+
+    ret_val.append(email_addresses[contact_email_address_str])
+
+  return ret_val
+
+
+def extract_contacts(texts, processes=None, chunk_size=100):
+  """
+  Batch version of extract_contact, each distinct text is parsed once. Pass processes to spread a large backfill
+  over a process pool, chunk_size texts are sent to a worker at a time.
+  """
+  texts = list(texts)
+  distinct_texts = list(set(texts))
+
+  if processes:
+    with Pool(processes) as pool:
+      contacts = pool.map(extract_contact, distinct_texts, chunk_size)
+  else:
+    contacts = [extract_contact(text) for text in distinct_texts]
+
+  contacts_by_text = dict(zip(distinct_texts, contacts))
+
+  return [contacts_by_text[text] for text in texts]
+
+
+def extract_contact(text):
+  """
+  Returns the Contact in a listing text, with None for the fields it doesn't have. The name and phone number come
+  from a single scan of the text, the email address needs the text de-obfuscated first and gets a pass of its own.
+  """
+  name = None
+  specific_phone_number_components = None
+  vague_phone_number_components = None
+
+  for match in contact_token_pattern.finditer(text):
+    if match.lastgroup == 'name':
+      name = name or _get_cued_contact_name(match.group('name'))
+    elif match.lastgroup == 'specific_phone_number':
+      specific_phone_number_components = specific_phone_number_components or match
+    elif match.lastgroup == 'vague_phone_number':
+      vague_phone_number_components = vague_phone_number_components or match
+
+    if name and specific_phone_number_components:
+      break
+
+  # like get_contact_phone_number, the first vague match only stands when there's no specific one
+  phone_number_components = specific_phone_number_components or vague_phone_number_components
+  phone_number = _format_phone_number(phone_number_components) if phone_number_components else None
+
+  return Contact(name, phone_number, get_contact_email_address(text))
+
+
+def _get_cued_contact_name(name_str):
+  name_words = []
+  for word in name_str.split():
+    if word in contact_name_stop_words:
+      break
+    name_words.append(word)
+
+  return ' '.join(name_words) or None
+
+
 def _deobfuscate_phrase(match):
   text = match.group(0)
   if '.' in text: return '.'
@@ -0,0 +1,32 @@
+import re
+
+# a header line plus any folded continuation lines, values come back the way email.message_from_string returns them
+header_pattern = re.compile(r'^([^\s:]+):[ \t]*(.*(?:\r?\n[ \t].*)*)', re.M)
+header_block_end_pattern = re.compile(r'\r?\n\r?\n')
+
+
+def get_headers(headers, header_names):
+  """
+  Finds only the given lowercase header names in a raw header block, and stops scanning as soon as all of them have
+  been seen. When a header repeats, the first one wins.
+  """
+  ret_val = {}
+
+  if not headers:
+    return ret_val
+
+  header_names = frozenset(header_names)
+
+  block_end = header_block_end_pattern.search(headers)
+  end_pos = block_end.start() if block_end else len(headers)
+
+  for match in header_pattern.finditer(headers, 0, end_pos):
+    name = match.group(1).lower()
+
+    if name in header_names and name not in ret_val:
+      ret_val[name] = match.group(2).rstrip('\r\n')
+
+      if len(ret_val) == len(header_names):
+        break
+
+  return ret_val
@@ -1,35 +1,51 @@
 import logging
+from django.contrib.contenttypes.models import ContentType
 from django.utils import encoding
-from untitled_api.libs.communication_utils.services import email_tasks
+from untitled_api.libs.communication_utils.services import email_service, email_tasks
 
 logger = logging.getLogger(__name__)
 
 
 def send_email(from_address, from_name, to_address, subject, plain_text_body, associated_model, eta=None):
-  associated_model_content_type_app = associated_model._meta.app_label
-  associated_model_content_type_model = associated_model._meta.verbose_name
-  associated_model_content_type_id = associated_model.pk
+  associated_model_content_type_id = ContentType.objects.get_for_model(associated_model).pk
+  associated_model_id = associated_model.pk
 
   email_tasks.send_email_task.apply_async(
     (
       from_address, from_name, to_address, subject, plain_text_body,
-      associated_model_content_type_app, associated_model_content_type_model,
-      associated_model_content_type_id,
+      associated_model_content_type_id, associated_model_id,
     ),
     eta=eta
   )
 
 
+def send_emails(outbound_emails, eta=None):
+  """Queues a list of OutboundEmail, one task per batch that email_service can send in a single request."""
+  for batch in email_service.group_outbound_emails(outbound_emails):
+    email_tasks.send_emails_task.apply_async(
+      (
+        [
+          (
+            outbound_email.from_address, outbound_email.from_name, outbound_email.to_address,
+            outbound_email.subject, outbound_email.plain_text_body,
+            ContentType.objects.get_for_model(outbound_email.associated_model).pk,
+            outbound_email.associated_model.pk,
+          )
+          for outbound_email in batch
+        ],
+      ),
+      eta=eta
+    )
+
+
 def reply_to_email(email, plain_text_body, associated_model, eta=None, **kwargs):
-  associated_model_content_type_app = associated_model._meta.app_label
-  associated_model_content_type_model = associated_model._meta.verbose_name
-  associated_model_content_type_id = associated_model.pk
+  associated_model_content_type_id = ContentType.objects.get_for_model(associated_model).pk
+  associated_model_id = associated_model.pk
 
   async_result = email_tasks.reply_to_email_task.apply_async(
     (
       email.pk, plain_text_body,
-      associated_model_content_type_app, associated_model_content_type_model,
-      associated_model_content_type_id,
+      associated_model_content_type_id, associated_model_id,
     ),
     kwargs=kwargs,
     eta=eta
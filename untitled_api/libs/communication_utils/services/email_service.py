@@ -1,9 +1,13 @@
+from collections import OrderedDict
 from email import utils
 from email.utils import parseaddr
 import logging
 import os
 from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
 from email_reply_parser import EmailReplyParser
+from untitled_api.libs.communication_utils.exceptions import EmailParseError, InvalidOutboundEmailError
 from untitled_api.libs.communication_utils.models import Email
 from untitled_api.libs.communication_utils.services import emailer
 from untitled_api.libs.communication_utils.signals import email_received
@@ -36,6 +40,20 @@ def save_or_update(email):
   return email
 
 
+def save_outbound_email(email_model, associated_model):
+  """Attaches the associated model before the first save so a sent email is validated and written once."""
+  email_model.associate_model(associated_model)
+  _clean_outbound_email(email_model)
+  email_model.save(internal=True)
+
+  return email_model
+
+
+def _clean_outbound_email(email_model):
+  # the content type comes from a model instance we already have, so skip the query that checks it exists
+  email_model.full_clean(exclude=['content_type'])
+
+
 def get_email(email_id):
   return Email.objects.get(pk=email_id)
 
@@ -47,6 +65,98 @@ def create_incoming_mail(email):
   return email
 
 
+def create_incoming_mails(payloads, batch_size=None):
+  """
+  Batch version of create_incoming_mail for inbound parse webhook payloads. Payloads that don't parse or validate,
+  and duplicates of an email we already have, are logged and dropped. Each chunk of batch_size is written with one
+  bulk_create and email_received is sent for each new email once its chunk is written. That's only a savepoint when
+  called inside a transaction, like a request under ATOMIC_REQUESTS, so receivers can still see it rolled back.
+  """
+  batch_size = batch_size or settings.INCOMING_EMAIL_BATCH_SIZE
+
+  ret_val = []
+  seen_keys = set()
+  emails = []
+
+  for payload in payloads:
+    try:
+      email = Email.construct_incoming_email(**payload)
+      # uniqueness is checked once per chunk below instead of a query per email
+      email.full_clean(validate_unique=False)
+    except (EmailParseError, ValidationError) as e:
+      logger.warn("Invalid incoming email, dropping it: {0!r}".format(e))
+      continue
+
+    key = (email.message_id, email.sent_date)
+    if key in seen_keys:
+      continue
+    seen_keys.add(key)
+
+    emails.append(email)
+
+    if len(emails) == batch_size:
+      ret_val.extend(_create_incoming_mail_batch(emails))
+      emails = []
+
+  if emails:
+    ret_val.extend(_create_incoming_mail_batch(emails))
+
+  return ret_val
+
+
+def _create_incoming_mail_batch(emails):
+  emails = _exclude_existing_emails(emails)
+
+  if emails:
+    try:
+      with transaction.atomic():
+        Email.objects.bulk_create(emails)
+      emails = _fetch_created_emails(emails)
+    except IntegrityError:
+      # another worker wrote one of these in the meantime, fall back to one row at a time for this chunk
+      emails = _create_incoming_mails_individually(emails)
+
+  for email in emails:
+    email_received.send(Email, instance=email)
+
+  return emails
+
+
+def _exclude_existing_emails(emails):
+  existing_keys = set(
+    Email.objects.filter(message_id__in=set(e.message_id for e in emails)).values_list('message_id', 'sent_date')
+  )
+
+  return [e for e in emails if (e.message_id, e.sent_date) not in existing_keys]
+
+
+def _fetch_created_emails(emails):
+  # bulk_create doesn't set primary keys, read the rows back so receivers get saved instances
+  created_emails = {}
+  latest_emails = {}
+  for e in Email.objects.filter(message_id__in=set(e.message_id for e in emails)).order_by('pk'):
+    created_emails[(e.message_id, e.sent_date)] = e
+    latest_emails[e.message_id] = e
+
+  # the database can hand sent_date back normalized, like with its precision cut, so fall back to the newest row
+  # with the message id
+  return [created_emails.get((e.message_id, e.sent_date)) or latest_emails[e.message_id] for e in emails]
+
+
+def _create_incoming_mails_individually(emails):
+  created_emails = []
+
+  for email in emails:
+    try:
+      with transaction.atomic():
+        email.save(internal=True)
+      created_emails.append(email)
+    except IntegrityError:
+      logger.warn("Duplicate incoming email, dropping it: {0}".format(email.message_id))
+
+  return created_emails
+
+
 def get_reply_contents(email):
   return EmailReplyParser.parse_reply(email.text)
 
@@ -71,13 +181,94 @@ def send_email(from_address, from_name, to_address, subject, plain_text_body, as
     subject=subject
   )
 
-  save_or_update(email_model)
-
-  associate_model_with_email(email_model, associated_model)
+  save_outbound_email(email_model, associated_model)
 
   logger.debug("Email sent: {0}".format(email_model))
 
 
+def send_emails(outbound_emails):
+  """
+  Sends a list of OutboundEmail. Emails sharing a sender, subject and body go out together in one sendgrid request
+  per OUTBOUND_EMAIL_BATCH_SIZE recipients, and the resulting Email rows are written with a single bulk_create per
+  request.
+  """
+  sent_email_models = []
+
+  for batch in group_outbound_emails(outbound_emails):
+    sent_email_models.extend(_send_email_batch(batch))
+
+  return sent_email_models
+
+
+def group_outbound_emails(outbound_emails, batch_size=None):
+  """Splits OutboundEmails into lists that can be sent in one request: same sender, subject and body."""
+  batch_size = batch_size or settings.OUTBOUND_EMAIL_BATCH_SIZE
+
+  groups = OrderedDict()
+  for outbound_email in outbound_emails:
+    key = (outbound_email.from_address, outbound_email.from_name, outbound_email.subject,
+           outbound_email.plain_text_body)
+    groups.setdefault(key, []).append(outbound_email)
+
+  for group in groups.values():
+    for i in range(0, len(group), batch_size):
+      yield group[i:i + batch_size]
+
+
+def _send_email_batch(batch):
+  first_email = batch[0]
+  html_body = convert_text_to_html(first_email.plain_text_body)
+  formatted_from_address = utils.formataddr((first_email.from_name, first_email.from_address))
+
+  email_models = []
+  for outbound_email in batch:
+    email_model = Email(
+      email_direction=Email.email_direction_outgoing,
+      text=outbound_email.plain_text_body,
+      html=html_body,
+      from_address=formatted_from_address,
+      to=outbound_email.to_address,
+      subject=outbound_email.subject
+    )
+    email_model.associate_model(outbound_email.associated_model)
+    _clean_outbound_email(email_model)
+    email_models.append(email_model)
+
+  try:
+    emailer.send_batch_email(
+      first_email.from_address, first_email.from_name, [e.to_address for e in batch], first_email.subject,
+      first_email.plain_text_body, html_body
+    )
+  except InvalidOutboundEmailError:
+    # a single bad recipient domain fails the whole request. Send them one by one so only that one is dropped.
+    email_models = _send_email_models_individually(first_email, html_body, email_models)
+
+  Email.objects.bulk_create(email_models)
+
+  logger.debug("Batch of {0} emails sent: {1}".format(len(email_models), first_email.subject))
+
+  return email_models
+
+
+def _send_email_models_individually(first_email, html_body, email_models):
+  sent_email_models = []
+
+  try:
+    for email_model in email_models:
+      try:
+        emailer.send_email(first_email.from_address, first_email.from_name, email_model.to, first_email.subject,
+                           first_email.plain_text_body, html_body)
+        sent_email_models.append(email_model)
+      except InvalidOutboundEmailError:
+        logger.warn("Invalid outbound email: {0}".format(email_model.to))
+  except Exception:
+    # an smtp or network error partway through still leaves a row for every email that went out
+    Email.objects.bulk_create(sent_email_models)
+    raise
+
+  return sent_email_models
+
+
 def reply_to_email(email, plain_text_body, associated_model, **kwargs):
   html_body = convert_text_to_html(plain_text_body)
 
@@ -109,9 +300,7 @@ def reply_to_email(email, plain_text_body, associated_model, **kwargs):
     in_reply_to_message_id=in_reply_to
   )
 
-  save_or_update(email_model)
-
-  associate_model_with_email(email_model, associated_model)
+  save_outbound_email(email_model, associated_model)
 
   logger.debug("Email replied: {0}".format(email_model))
 
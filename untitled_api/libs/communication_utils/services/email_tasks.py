@@ -1,24 +1,35 @@
+from collections import defaultdict
 import logging
 from smtplib import SMTPException
 from celery.exceptions import Ignore
 from celery import shared_task
+from celery.signals import worker_process_init
+from django.apps import apps
 from django.contrib.contenttypes.models import ContentType
 from django.utils import encoding
 from untitled_api.libs.communication_utils.exceptions import InvalidOutboundEmailError
+from untitled_api.libs.communication_utils.outbound_email import OutboundEmail
 from untitled_api.libs.communication_utils.services import email_service
 from untitled_api.libs.python_utils.errors.exceptions import log_ex_with_message
 
 logger = logging.getLogger(__name__)
 
 
+@worker_process_init.connect
+def warm_content_type_cache(**kwargs):
+  # ContentType.objects caches per process, fill it once so tasks only query for their associated model
+  ContentType.objects.get_for_models(*apps.get_models())
+
+
 @shared_task(bind=True)
-def send_email_task(self, from_address, from_name, to_address, subject, plain_text_body,
-                    associated_model_content_type_app, associated_model_content_type_model, associated_model_id):
-  associated_model_type = ContentType.objects.get(
-    app_label=associated_model_content_type_app, model=associated_model_content_type_model
-  )
+def send_email_task(self, from_address, from_name, to_address, subject, plain_text_body, *associated_model_args):
+  """
+  associated_model_args is (associated_model_content_type_id, associated_model_id), or the older
+  (app_label, model, associated_model_id)
+  """
+  associated_model_type = _get_associated_model_type(associated_model_args[:-1])
 
-  associated_model = associated_model_type.get_object_for_this_type(pk=associated_model_id)
+  associated_model = associated_model_type.get_object_for_this_type(pk=associated_model_args[-1])
 
   try:
     email_service.send_email(from_address, from_name, to_address, subject, plain_text_body, associated_model)
@@ -30,17 +41,16 @@ def send_email_task(self, from_address, from_name, to_address, subject, plain_te
 
 
 @shared_task(bind=True)
-def reply_to_email_task(self, email_id, plain_text_body, associated_model_content_type_app,
-                        associated_model_content_type_model,
-                        associated_model_id, **kwargs):
-
-  associated_model_type = ContentType.objects.get(
-    app_label=associated_model_content_type_app, model=associated_model_content_type_model
-  )
+def reply_to_email_task(self, email_id, plain_text_body, *associated_model_args, **kwargs):
+  """
+  associated_model_args is (associated_model_content_type_id, associated_model_id), or the older
+  (app_label, model, associated_model_id)
+  """
+  associated_model_type = _get_associated_model_type(associated_model_args[:-1])
 
   email = email_service.get_email(email_id)
 
-  associated_model = associated_model_type.get_object_for_this_type(pk=associated_model_id)
+  associated_model = associated_model_type.get_object_for_this_type(pk=associated_model_args[-1])
 
   try:
     email_service.reply_to_email(email, plain_text_body, associated_model, **kwargs)
@@ -53,3 +63,57 @@ def reply_to_email_task(self, email_id, plain_text_body, associated_model_conten
   except SMTPException as e:
     logger.warn(log_ex_with_message("SMTP Error replying to email", e))
     raise self.retry(exc=e)
+
+
+@shared_task(bind=True)
+def send_emails_task(self, outbound_emails):
+  """
+  outbound_emails is a list of (from_address, from_name, to_address, subject, plain_text_body,
+  associated_model_content_type_id, associated_model_id). The older (..., app_label, model, associated_model_id) form
+  is still accepted.
+  """
+  associated_models = _get_associated_models(outbound_emails)
+
+  emails_to_send = []
+  for outbound_email in outbound_emails:
+    from_address, from_name, to_address, subject, plain_text_body = outbound_email[:5]
+    associated_model = associated_models.get((tuple(outbound_email[5:-1]), outbound_email[-1]))
+
+    if associated_model is None:
+      logger.warn("Associated model missing, not sending email to: {0}".format(to_address))
+      continue
+
+    emails_to_send.append(
+      OutboundEmail(from_address, from_name, to_address, subject, plain_text_body, associated_model)
+    )
+
+  try:
+    email_service.send_emails(emails_to_send)
+  except SMTPException as e:
+    logger.warn(log_ex_with_message("SMTP Error sending email batch", e))
+    raise self.retry(exc=e)
+
+
+def _get_associated_models(outbound_emails):
+  # one query per content type instead of one per email
+  ids_by_content_type = defaultdict(set)
+  for outbound_email in outbound_emails:
+    ids_by_content_type[tuple(outbound_email[5:-1])].add(outbound_email[-1])
+
+  associated_models = {}
+  for content_type_args, ids in ids_by_content_type.items():
+    associated_model_type = _get_associated_model_type(content_type_args)
+
+    for pk, associated_model in associated_model_type.model_class()._default_manager.in_bulk(list(ids)).items():
+      associated_models[(content_type_args, pk)] = associated_model
+
+  return associated_models
+
+
+def _get_associated_model_type(content_type_args):
+  # tasks queued before the content type id was passed have (app_label, model) in its place. they're still accepted
+  # for one release, so the queues can drain across the deploy.
+  if len(content_type_args) == 2:
+    return ContentType.objects.get_by_natural_key(*content_type_args)
+
+  return ContentType.objects.get_for_id(content_type_args[0])
@@ -18,6 +18,21 @@ def send_email(from_address, from_name, to_address, subject, text, html, headers
   if headers:
     msg.set_headers(headers)
 
+  _send(msg)
+
+
+def send_batch_email(from_address, from_name, to_addresses, subject, text, html):
+  """Sends the same message to every address in one request. Each recipient gets their own copy."""
+  msg = sendgrid.Mail(from_address=from_address,from_name=from_name,subject=subject,text=text,html= html)
+
+  # sendgrid requires a regular 'to' but delivers to the x-smtpapi list instead when one is set
+  msg.add_to(to_addresses[0])
+  msg.set_tos(list(to_addresses))
+
+  _send(msg)
+
+
+def _send(msg):
   if settings.DEBUG:
     logger.debug("{sep}******{sep}{0}{sep}{1}{sep}******".format(msg.subject, msg.text, sep=os.linesep))
   else:
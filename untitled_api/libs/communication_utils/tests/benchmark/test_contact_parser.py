@@ -0,0 +1,81 @@
+import logging
+import re
+import timeit
+
+from untitled_api.libs.communication_utils.parsing import contact_parser
+from untitled_api.libs.housing_utils.tests import listing_corpus
+from untitled_api.libs.python_utils.testing import benchmark_utils
+from untitled_api.libs.text_utils.formatting.text_formatter import unescape, despacify, decodeJs
+
+listing_body = (
+  'Sunny 2 bedroom apartment at 248 E 2nd Street. Hardwood floors, new appliances &amp; a large bathtub. '
+  '<b>No fee!</b> Pets are permitted in the building... call to view -- {0} ------------ thanks'
+)
+contacts = [
+  '', 'foo@bar.com', 'foo at bar dot com', 'foo [at] bar [dot] com', 'fooNOSPAM@bar.com', 'f o o @ b a r . c o m',
+  'foo&#64;bar.com', 'fromCharCode(102,111,111,64,98,97,114,46,99,111,109)', 'fooATbarDOTcom', 'www.dwellee.com',
+]
+
+
+def _legacy_get_contact_email_address(contact_email_address_str):
+  # get_contact_email_address before its patterns were precompiled and guarded, kept as a reference
+  email_address = None
+  text = unescape(contact_email_address_str)
+  text = re.sub(r'<[^>]+>', r'', text)
+  text = re.sub(r'\b\.\s', '[PERIOD] ', text)
+  text = despacify(text)
+  text = re.sub(r'[^A-Z0-9\-]*\.[^A-Z0-9\-]*|\W+dot\W+|\W+d0t\W+', r'.', text, flags=re.IGNORECASE)
+  text = re.sub(r'([a-z0-9])DOT([a-z0-9])', r'\1.\2', text)
+  text = re.sub(r'([A-Z0-9])dot([A-Z0-9])', r'\1.\2', text)
+  text = re.sub(r'\W*@\W*|\W+at\W+', r'@', text, flags=re.IGNORECASE)
+  text = re.sub(r'([a-z0-9])AT([a-z0-9])', r'\1@\2', text)
+  text = re.sub(r'([A-Z0-9])at([A-Z0-9])', r'\1@\2', text)
+  text = re.sub(r'[_\W]*n[_\W]*(o|0)[_\W]*(s|5)[_\W]*p[_\W]*a[_\W]*m[_\W]*', contact_parser._deobfuscate_phrase, text,
+                flags=re.IGNORECASE)
+  text = decodeJs(text)
+  try:
+    email_address = re.compile(
+      r'\b[A-Z0-9\._\-]+@[A-Z0-9\.\-]+\.(?:[A-Z]{'
+      r'2}|com|org|net|edu|gov|mil|biz|info|mobi|name|aero|asia|jobs|museum)\b',
+      flags=re.IGNORECASE).search(text).group(0)
+    if 'www.' in email_address:
+      email_address = None
+  except:
+    logging.getLogger(__name__).debug("Error parsing email", exc_info=1)
+
+  return email_address
+
+
+def test_contact_email_address_throughput(capsys):
+  # distinct bodies so the batch api's dedupe doesn't flatter it
+  bodies = [listing_body.format(contacts[i % len(contacts)]) + ' #{0}'.format(i) for i in range(2000)]
+
+  assert [_legacy_get_contact_email_address(b) for b in bodies] == contact_parser.get_contact_email_addresses(bodies)
+
+  legacy_seconds = min(timeit.repeat(lambda: [_legacy_get_contact_email_address(b) for b in bodies], number=1,
+                                     repeat=3))
+  seconds = min(timeit.repeat(lambda: contact_parser.get_contact_email_addresses(bodies), number=1, repeat=3))
+
+  with capsys.disabled():
+    print('\ncontact_parser.get_contact_email_addresses: {0:,.0f} bodies/s'.format(len(bodies) / seconds))
+    print('legacy get_contact_email_address: {0:,.0f} bodies/s'.format(len(bodies) / legacy_seconds))
+
+
+def test_extract_contacts_throughput(capsys):
+  bodies = [listing_body.format(contacts[i % len(contacts)]) + ' 212-555-{0:04d}'.format(i) for i in range(20000)]
+
+  seconds = min(timeit.repeat(lambda: contact_parser.extract_contacts(bodies), number=1, repeat=3))
+  pool_seconds = min(timeit.repeat(lambda: contact_parser.extract_contacts(bodies, processes=4), number=1, repeat=3))
+
+  with capsys.disabled():
+    print('\ncontact_parser.extract_contacts: {0:,.0f} bodies/s'.format(len(bodies) / seconds))
+    print('contact_parser.extract_contacts, 4 processes: {0:,.0f} bodies/s'.format(len(bodies) / pool_seconds))
+
+
+def test_extract_contact_against_baseline(capsys, pytestconfig):
+  listings = listing_corpus.generate_listings(10000)
+
+  result = benchmark_utils.measure(contact_parser.extract_contact, [l.body for l in listings])
+
+  with capsys.disabled():
+    benchmark_utils.report(pytestconfig, 'communication_utils.contact_parser.extract_contact', result)
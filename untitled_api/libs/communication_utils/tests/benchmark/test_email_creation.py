@@ -0,0 +1,28 @@
+import timeit
+
+import pytest
+from untitled_api.libs.communication_utils.models import Email
+from untitled_api.libs.communication_utils.services import email_service
+from untitled_api.libs.communication_utils.tests.email_test_data import build_incoming_email_payloads
+
+
+@pytest.mark.django_db_with_migrations
+def test_incoming_mail_ingestion_throughput(capsys):
+  payload_count = 10000
+  payloads = build_incoming_email_payloads(payload_count)
+
+  bulk_seconds = timeit.timeit(lambda: email_service.create_incoming_mails(payloads), number=1)
+  assert Email.objects.count() == payload_count
+
+  Email.objects.all().delete()
+
+  # one save per email is slow enough that a tenth of the payloads shows the difference
+  single_count = payload_count // 10
+  single_seconds = timeit.timeit(
+    lambda: [email_service.create_incoming_mail(Email.construct_incoming_email(**p)) for p in payloads[:single_count]],
+    number=1
+  )
+
+  with capsys.disabled():
+    print('\nemail_service.create_incoming_mails: {0:,.0f} emails/s'.format(payload_count / bulk_seconds))
+    print('email_service.create_incoming_mail: {0:,.0f} emails/s'.format(single_count / single_seconds))
@@ -93,3 +93,13 @@ email_2 = {
 }
 
 
+
+
+def build_incoming_email_payloads(count, template=email_1):
+  """Copies of an inbound parse payload that each get their own Message-id, for batch and benchmark tests."""
+  message_id = '<11471247.33986.1361999987364.JavaMail.root@vms170015>'
+
+  return [
+    dict(template, headers=template['headers'].replace(message_id, '<{0}.synthetic@test.com>'.format(i)))
+    for i in range(count)
+  ]
@@ -1,8 +1,13 @@
+import copy
 from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mock import patch
 import pytest
 from untitled_api.libs.communication_utils.models import Email
 from untitled_api.libs.communication_utils.services import email_service
-from untitled_api.libs.communication_utils.tests.email_test_data import email_1
+from untitled_api.libs.communication_utils.signals import email_received
+from untitled_api.libs.communication_utils.tests.email_test_data import build_incoming_email_payloads, email_1, email_2
 
 
 @pytest.mark.django_db_with_migrations
@@ -22,3 +27,61 @@ def test_email_fails_with_high_spam():
     email = Email.construct_incoming_email(**dict(email_1, **{'spam_score': 10}))
 
     email_id = email_service.save_or_update(email).id
+
+
+@pytest.mark.django_db_with_migrations
+def test_incoming_mails_are_created_in_bulk():
+  payloads = build_incoming_email_payloads(5)
+  received = []
+
+  def receiver(sender, instance, **kwargs):
+    received.append(instance)
+
+  email_received.connect(receiver)
+  try:
+    with CaptureQueriesContext(connection) as queries:
+      emails = email_service.create_incoming_mails(payloads, batch_size=2)
+  finally:
+    email_received.disconnect(receiver)
+
+  assert Email.objects.count() == 5
+  assert [e.pk for e in received] == [e.pk for e in emails]
+  assert all(e.pk for e in emails)
+  # existing lookup, insert and read back per chunk of 2
+  assert len([q for q in queries if 'SAVEPOINT' not in q['sql']]) == 9
+
+
+@pytest.mark.django_db_with_migrations
+def test_incoming_mails_are_deduped():
+  email_service.create_incoming_mail(Email.construct_incoming_email(**email_1))
+  payloads = [email_1, email_2, email_2]
+
+  emails = email_service.create_incoming_mails(payloads)
+
+  assert len(emails) == 1
+  assert Email.objects.count() == 2
+
+
+@pytest.mark.django_db_with_migrations
+def test_invalid_incoming_mails_are_dropped():
+  payloads = [dict(email_1, spam_score=10), dict(email_2, headers='Subject: no message id\n')]
+
+  assert email_service.create_incoming_mails(payloads) == []
+  assert Email.objects.count() == 0
+
+
+@pytest.mark.django_db_with_migrations
+def test_incoming_mails_tolerate_normalized_sent_dates():
+  payloads = build_incoming_email_payloads(2)
+
+  def bulk_create(emails):
+    # like a database storing sent_date at a coarser precision than we gave it
+    for email in emails:
+      stored_email = copy.copy(email)
+      stored_email.sent_date = email.sent_date.replace(second=0)
+      stored_email.save(internal=True)
+
+  with patch.object(Email.objects, 'bulk_create', side_effect=bulk_create):
+    emails = email_service.create_incoming_mails(payloads)
+
+  assert sorted(e.pk for e in emails) == sorted(Email.objects.values_list('pk', flat=True))
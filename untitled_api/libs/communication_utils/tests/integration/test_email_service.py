@@ -0,0 +1,154 @@
+from smtplib import SMTPException
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mock import patch
+import pytest
+from untitled_api.libs.communication_utils.exceptions import InvalidOutboundEmailError
+from untitled_api.libs.communication_utils.models import Email
+from untitled_api.libs.communication_utils.outbound_email import OutboundEmail
+from untitled_api.libs.communication_utils.services import email_sender_async, email_service, email_tasks
+from untitled_api.libs.communication_utils.tests.email_test_data import email_1
+from untitled_api.libs.django_utils.tests import FakeTestClass
+
+
+@pytest.fixture
+def associated_model():
+  associated_model = FakeTestClass(name='Some Name', url='http://www.test.com', trusted_geo_data=False)
+  associated_model.save()
+  # the content type cache is process wide, warm it so query counts don't depend on test order
+  ContentType.objects.get_for_model(associated_model)
+  return associated_model
+
+
+def _outbound_emails(associated_model, to_addresses, subject='Hello'):
+  return [
+    OutboundEmail('system@test.com', 'System', to_address, subject, 'Some body', associated_model)
+    for to_address in to_addresses
+  ]
+
+
+@pytest.mark.django_db_with_migrations
+def test_send_emails_sends_one_request_per_group(associated_model):
+  outbound_emails = _outbound_emails(associated_model, ['a@test.com', 'b@test.com', 'c@test.com'])
+  outbound_emails += _outbound_emails(associated_model, ['d@test.com'], subject='Other')
+
+  with patch('untitled_api.libs.communication_utils.services.emailer.send_batch_email') as send_batch_email:
+    email_service.send_emails(outbound_emails)
+
+  assert send_batch_email.call_count == 2
+  assert send_batch_email.call_args_list[0][0][2] == ['a@test.com', 'b@test.com', 'c@test.com']
+  assert Email.objects.filter(object_id=associated_model.pk).count() == 4
+  assert all(e.content_object == associated_model for e in Email.objects.all())
+
+
+@pytest.mark.django_db_with_migrations
+def test_send_emails_drops_only_invalid_recipients(associated_model):
+  outbound_emails = _outbound_emails(associated_model, ['a@test.com', 'b@invalid', 'c@test.com'])
+
+  def send_email(from_address, from_name, to_address, *args):
+    if to_address == 'b@invalid':
+      raise InvalidOutboundEmailError()
+
+  with patch('untitled_api.libs.communication_utils.services.emailer.send_batch_email',
+             side_effect=InvalidOutboundEmailError()), \
+       patch('untitled_api.libs.communication_utils.services.emailer.send_email', side_effect=send_email):
+    email_service.send_emails(outbound_emails)
+
+  assert sorted(Email.objects.values_list('to', flat=True)) == ['a@test.com', 'c@test.com']
+
+
+@pytest.mark.django_db_with_migrations
+def test_send_emails_writes_sent_emails_when_sending_fails_partway(associated_model):
+  outbound_emails = _outbound_emails(associated_model, ['a@test.com', 'b@invalid', 'c@test.com'])
+
+  def send_email(from_address, from_name, to_address, *args):
+    if to_address == 'b@invalid':
+      raise InvalidOutboundEmailError()
+    if to_address == 'c@test.com':
+      raise SMTPException()
+
+  with patch('untitled_api.libs.communication_utils.services.emailer.send_batch_email',
+             side_effect=InvalidOutboundEmailError()), \
+       patch('untitled_api.libs.communication_utils.services.emailer.send_email', side_effect=send_email), \
+       pytest.raises(SMTPException):
+    email_service.send_emails(outbound_emails)
+
+  assert list(Email.objects.values_list('to', flat=True)) == ['a@test.com']
+
+
+@pytest.mark.django_db_with_migrations
+def test_send_emails_async_queues_batches(associated_model):
+  outbound_emails = _outbound_emails(associated_model, ['a@test.com', 'b@test.com'])
+
+  with patch('untitled_api.libs.communication_utils.services.emailer.send_batch_email') as send_batch_email:
+    email_sender_async.send_emails(outbound_emails)
+
+  assert send_batch_email.call_count == 1
+  assert Email.objects.count() == 2
+
+
+@pytest.mark.django_db_with_migrations
+def test_send_email_writes_email_once(associated_model):
+  with patch('untitled_api.libs.communication_utils.services.emailer.send_email'), \
+       CaptureQueriesContext(connection) as queries:
+    email_service.send_email('system@test.com', 'System', 'a@test.com', 'Hello', 'Some body', associated_model)
+
+  assert len(queries) == 1
+  assert Email.objects.get().content_object == associated_model
+
+
+@pytest.mark.django_db_with_migrations
+def test_reply_to_email_writes_email_once(associated_model):
+  email = email_service.create_incoming_mail(Email.construct_incoming_email(**email_1))
+
+  with patch('untitled_api.libs.communication_utils.services.emailer.send_email'), \
+       CaptureQueriesContext(connection) as queries:
+    email_service.reply_to_email(email, 'Some body', associated_model, from_name='System')
+
+  assert len(queries) == 1
+  assert Email.objects.get(in_reply_to_message_id=email.message_id).content_object == associated_model
+
+
+@pytest.mark.django_db_with_migrations
+def test_send_email_task_only_queries_for_associated_model(associated_model):
+  ContentType.objects.clear_cache()
+  email_tasks.warm_content_type_cache()
+  content_type_id = ContentType.objects.get_for_model(associated_model).pk
+
+  with patch('untitled_api.libs.communication_utils.services.emailer.send_email'), \
+       CaptureQueriesContext(connection) as queries:
+    email_tasks.send_email_task.apply(
+      ('system@test.com', 'System', 'a@test.com', 'Hello', 'Some body', content_type_id, associated_model.pk)
+    )
+
+  # fetching the associated model and inserting the email
+  assert len(queries) == 2
+  assert Email.objects.get().content_object == associated_model
+
+
+@pytest.mark.django_db_with_migrations
+def test_send_email_async_passes_content_type_id(associated_model):
+  with patch('untitled_api.libs.communication_utils.services.emailer.send_email'):
+    email_sender_async.send_email('system@test.com', 'System', 'a@test.com', 'Hello', 'Some body', associated_model)
+
+  assert Email.objects.get().content_object == associated_model
+
+
+@pytest.mark.django_db_with_migrations
+def test_email_tasks_accept_app_label_and_model(associated_model):
+  content_type = ContentType.objects.get_for_model(associated_model)
+
+  with patch('untitled_api.libs.communication_utils.services.emailer.send_email'), \
+       patch('untitled_api.libs.communication_utils.services.emailer.send_batch_email'):
+    email_tasks.send_email_task.apply(
+      ('system@test.com', 'System', 'a@test.com', 'Hello', 'Some body', content_type.app_label, content_type.model,
+       associated_model.pk)
+    )
+    email_tasks.send_emails_task.apply((
+      [('system@test.com', 'System', 'b@test.com', 'Hello', 'Some body', content_type.app_label, content_type.model,
+        associated_model.pk)],
+    ))
+
+  assert sorted(Email.objects.values_list('to', flat=True)) == ['a@test.com', 'b@test.com']
+  assert all(e.content_object == associated_model for e in Email.objects.all())
@@ -18,3 +18,47 @@ def test_contact_parser_detects_phone_number(input_values, expected):
 ])
 def test_contact_parser_detects_email_address(input_values, expected):
   assert expected == contact_parser.get_contact_email_address(input_values)
+
+
+def test_contact_parser_detects_email_addresses_in_batch():
+  texts = ['abc foo@bar.com abc 123', 'no address here', 'abc foo@bar.com abc 123', 'foo at bar dot com']
+  assert ['foo@bar.com', None, 'foo@bar.com', 'foo@bar.com'] == contact_parser.get_contact_email_addresses(texts)
+
+
+@pytest.mark.parametrize("processes", [None, 2])
+def test_contact_parser_extracts_contacts(processes):
+  text = ' Caliber Associates (646) 597-6005 foo at bar dot com '
+  texts = [text, 'nothing here', text]
+
+  contacts = contact_parser.extract_contacts(texts, processes=processes)
+
+  assert contacts[0] == contact_parser.Contact(None, '(646) 597-6005', 'foo@bar.com')
+  assert contacts[1] == contact_parser.Contact(None, None, None)
+  assert contacts[2] == contacts[0]
+
+
+def test_contact_parser_extracts_contacts_from_a_generator():
+  texts = ('Call Jane Doe at 212-555-1234', 'nothing here')
+
+  contacts = contact_parser.extract_contacts(text for text in texts)
+
+  assert contacts == [
+    contact_parser.Contact('Jane Doe', '(212) 555-1234', None), contact_parser.Contact(None, None, None)
+  ]
+
+
+@pytest.mark.parametrize(("input_values", "expected"), [
+  ('Call Jane Doe at 212-555-1234', contact_parser.Contact('Jane Doe', '(212) 555-1234', None)),
+  ('No fee! ask for Maria, maria at bar dot com', contact_parser.Contact('Maria', None, 'maria@bar.com')),
+  ('Call Mike Today 2 1 2 5 5 5 1 2 3 4', contact_parser.Contact('Mike', '(212) 555-1234', None)),
+  ('Contact Us at http://www.test.com/2125551234 or 646 597 6005',
+   contact_parser.Contact(None, '(646) 597-6005', None)),
+  ('apt 4 212 555 1234', contact_parser.Contact(None, '(212) 555-1234', None)),
+  ('unit 3, 212-555-1234', contact_parser.Contact(None, '(212) 555-1234', None)),
+  ('#3 2125551234', contact_parser.Contact(None, '(212) 555-1234', None)),
+  ('5 212 555 1234', contact_parser.Contact(None, '(212) 555-1234', None)),
+  ('call 2 1 2 5 5 5 1 2 3 4 or 646 597 6005', contact_parser.Contact(None, '(646) 597-6005', None)),
+])
+def test_contact_parser_extracts_contact(input_values, expected):
+  assert expected == contact_parser.extract_contact(input_values)
+  assert expected.phone_number == contact_parser.get_contact_phone_number(input_values)
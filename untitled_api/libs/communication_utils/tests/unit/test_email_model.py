@@ -51,3 +51,11 @@ def test_email_model_validates_unknown_kwargs():
   email_dict = dict(email_1, **{'content-ids': 'none', 'attachment-info': 'none'})
   Email.construct_incoming_email(**email_dict)
 
+
+
+def test_email_model_parses_all_headers_lazily():
+  email = Email.construct_incoming_email(**email_1)
+
+  assert 'parsed_headers' not in email.__dict__
+  assert len(email.parsed_headers.get_all('received')) == 4
+  assert email.parsed_headers is email.parsed_headers
@@ -1,4 +1,5 @@
 import pytest
+from untitled_api.libs.communication_utils.outbound_email import OutboundEmail
 from untitled_api.libs.communication_utils.services import email_service
 
 
@@ -11,3 +12,16 @@ from untitled_api.libs.communication_utils.services import email_service
 ])
 def test_email_service_detects_spam(input_values, expected):
   assert expected == email_service.is_spam(**input_values)
+
+
+def test_email_service_groups_outbound_emails_by_content():
+  outbound_emails = [
+    OutboundEmail('system@test.com', 'System', to_address, subject, 'Some body', None)
+    for to_address, subject in [('a@test.com', 'Hi'), ('b@test.com', 'Bye'), ('c@test.com', 'Hi'),
+                                ('d@test.com', 'Hi')]
+  ]
+
+  batches = list(email_service.group_outbound_emails(outbound_emails, batch_size=2))
+
+  assert [[e.to_address for e in batch] for batch in batches] == [['a@test.com', 'c@test.com'], ['d@test.com'],
+                                                                 ['b@test.com']]
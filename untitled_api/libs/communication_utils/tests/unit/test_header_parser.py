@@ -0,0 +1,27 @@
+from email import message_from_string
+import pytest
+from untitled_api.libs.communication_utils.parsing import header_parser
+from untitled_api.libs.communication_utils.tests.email_test_data import email_1, email_2
+
+
+@pytest.mark.parametrize("headers", [email_1['headers'], email_2['headers']])
+def test_header_parser_matches_message_from_string(headers):
+  header_names = ('message-id', 'date', 'subject', 'to', 'dkim-signature')
+  message = message_from_string(headers)
+
+  expected = {name: message[name] for name in header_names if message[name] is not None}
+
+  assert expected == header_parser.get_headers(headers, header_names)
+
+
+@pytest.mark.parametrize(("headers", "expected"), [
+  ('Message-ID: <a@test.com>\n', {'message-id': '<a@test.com>'}),
+  ('message-id:<a@test.com>\r\nSubject: hi\r\n', {'message-id': '<a@test.com>'}),
+  ('Message-ID:\r\n <a@test.com>\r\n', {'message-id': '\r\n <a@test.com>'}),
+  ('Message-ID: <a@test.com>\nMessage-ID: <b@test.com>\n', {'message-id': '<a@test.com>'}),
+  ('Subject: hi\n\nMessage-ID: <a@test.com>\n', {}),
+  ('', {}),
+  (None, {}),
+])
+def test_header_parser_finds_headers(headers, expected):
+  assert expected == header_parser.get_headers(headers, ('message-id',))
@@ -0,0 +1,12 @@
+from untitled_api.libs.datetime_utils.parsers import datetime_parser
+from untitled_api.libs.housing_utils.tests import listing_corpus
+from untitled_api.libs.python_utils.testing import benchmark_utils
+
+
+def test_get_datetime_against_baseline(capsys, pytestconfig):
+  listings = listing_corpus.generate_listings(10000)
+
+  result = benchmark_utils.measure(datetime_parser.get_datetime, [l.posted_at for l in listings])
+
+  with capsys.disabled():
+    benchmark_utils.report(pytestconfig, 'datetime_utils.datetime_parser.get_datetime', result)
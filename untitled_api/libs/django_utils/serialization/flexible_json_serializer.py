@@ -1,15 +1,47 @@
 #http://web.archive.org/web/20120414135953/http://www.traddicts
 # .org/webdevelopment/flexible-and-simple-json-serialization-for-django
 #http://stackoverflow.com/questions/2249792/json-serializing-django-models-with-simplejson
-from datetime import datetime
+from datetime import date, time
+from decimal import Decimal
+from functools import partial
 from io import StringIO
-from django.core import serializers
+from json.encoder import encode_basestring_ascii
+from uuid import UUID
 from django.db.models import Model
 from django.db.models.query import QuerySet
-from django.utils.encoding import smart_unicode
-from django.utils.simplejson import dumps
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.encoding import smart_text, is_protected_type
+from collections import namedtuple
 import collections
 
+# fields is a list of (json key prefix, handler, field). The handlers are plain functions taking the serializer.
+ModelEncodingPlan = namedtuple('ModelEncodingPlan', 'model_label fields fk_fields m2m_fields')
+
+_json_encoder = DjangoJSONEncoder()
+_json_booleans = {True: 'true', False: 'false', None: 'null'}
+_infinity = float('inf')
+
+
+def _encode_float(value):
+  if value != value or value == _infinity or value == -_infinity:
+    # NaN and Infinity aren't valid float literals, let the encoder decide how to write them
+    return _json_encoder.encode(value)
+  return float.__repr__(value)
+
+
+def _encode_key(key):
+  if not isinstance(key, str):
+    key = _json_encoder.encode(key) if key is None or isinstance(key, (bool, int, float)) else str(key)
+  return encode_basestring_ascii(key)
+
+
+def _encode_isoformat(value):
+  return encode_basestring_ascii(value.isoformat())
+
+
+def _encode_as_string(value):
+  return encode_basestring_ascii(str(value))
+
 
 class UnableToSerializeError(Exception):
   """ Error for not implemented classes """
@@ -24,33 +56,75 @@ class UnableToSerializeError(Exception):
 
 class JSONSerializer():
   boolean_fields = ['BooleanField', 'NullBooleanField']
-  datetime_fields = ['DatetimeField', 'DateField', 'TimeField']
-  number_fields = ['IntegerField', 'AutoField', 'DecimalField', 'FloatField', 'PositiveSmallIntegerField']
+  datetime_fields = ['DateTimeField', 'DateField', 'TimeField']
+  number_fields = ['IntegerField', 'AutoField', 'DecimalField', 'FloatField', 'PositiveSmallIntegerField',
+                   'PositiveIntegerField', 'SmallIntegerField', 'BigIntegerField']
 
-  def serialize(self, obj, **options):
-    self.options = options
+  # encoding plans shared by every serializer instance, see get_model_plan
+  _model_plans = {}
+
+  # roughly how many characters stream_serialize buffers before yielding a chunk
+  chunk_size = 64 * 1024
+
+  # how many queryset rows share one round of relation queries. Keep it under sqlite's 999 parameter limit.
+  batch_size = 500
 
+  def serialize(self, obj, **options):
     self.stream = options.pop("stream", StringIO())
-    self.selectedFields = options.pop("fields", None)
-    self.ignoredFields = options.pop("ignored", None)
-    self.use_natural_keys = options.pop("use_natural_keys", False)
-    self.currentLoc = ''
 
+    for chunk in self.stream_serialize(obj, **options):
+      self.stream.write(chunk)
+
+    return self.getvalue()
 
-    self.django_json_serializer = serializers.get_serializer("json")()
+  def stream_serialize(self, obj, **options):
+    """
+    Yields the serialized object in chunks instead of building the whole document in memory.
+    Querysets are read with .iterator() so only the current chunk is held at any time.
+    Ex: StreamingHttpResponse(JSONSerializer().stream_serialize(data), content_type='application/json')
+
+    For tables too big for .iterator() (the db driver still fetches every row), pass chunked=True to read
+    querysets batch_size rows at a time ordered by pk, and defer=[...] to skip heavy columns. Deferred columns
+    are left out of the output.
+    Ex: stream_serialize(Email.objects.all(), chunked=True, batch_size=1000, defer=['headers', 'text', 'html'])
+    """
+    self.options = options
+
+    chunk_size = options.pop("chunk_size", self.chunk_size)
+    self.selectedFields = _as_frozenset(options.pop("fields", None))
+    self.ignoredFields = _as_frozenset(options.pop("ignored", None))
+    self.use_natural_keys = options.pop("use_natural_keys", False)
+    self.batch_size = options.pop("batch_size", self.batch_size)
+    self.chunked = options.pop("chunked", False)
+    self.deferredFields = _as_frozenset(options.pop("defer", None))
+    self.path = []
+    self._dispatch = {}
+    self._m2m_values = {}
 
     self.level = 0
 
     self.start_serialization()
 
-    self.handle_object(obj)
+    buffered = []
+    buffered_size = 0
+
+    for fragment in self.handle_object(obj):
+      buffered.append(fragment)
+      buffered_size += len(fragment)
+
+      if buffered_size >= chunk_size:
+        yield ''.join(buffered)
+        buffered = []
+        buffered_size = 0
 
     self.end_serialization()
-    return self.getvalue()
+
+    if buffered:
+      yield ''.join(buffered)
 
   def get_string_value(self, obj, field):
     """Convert a field's value to a string."""
-    return smart_unicode(field.value_to_string(obj))
+    return smart_text(field.value_to_string(obj))
 
   def start_serialization(self):
     """Called when serializing of the queryset starts."""
@@ -62,158 +136,352 @@ class JSONSerializer():
 
   def start_array(self):
     """Called when serializing of an array starts."""
-    self.stream.write('[')
+    return '['
 
   def end_array(self):
     """Called when serializing of an array ends."""
-    self.stream.write(']')
+    return ']'
 
   def start_object(self):
     """Called when serializing of an object starts."""
-    self.stream.write('{')
+    return '{'
 
   def end_object(self):
     """Called when serializing of an object ends."""
-    self.stream.write('}')
+    return '}'
 
   def handle_object(self, object):
     """ Called to handle everything, looks for the correct handling """
-    if isinstance(object, dict):
-      self.handle_dictionary(object)
-    elif isinstance(object, list):
-      self.handle_list(object)
-    elif isinstance(object, Model):
-      self.handle_model(object)
-    elif isinstance(object, QuerySet):
-      self.handle_queryset(object)
-    elif isinstance(object, bool):
-      self.handle_simple(object)
-    elif isinstance(object, int) or isinstance(object, float) or isinstance(object, int):
-      self.handle_simple(object)
-    elif isinstance(object, str):
-      self.handle_simple(object)
-    elif object is None:
-      self.handle_simple(object)
-    elif isinstance(object, datetime):
-      self.handle_date(object)
-    elif hasattr(object, '_asdict'):
-      self.handle_dictionary(object._asdict())
+    encoder, handler = self.get_dispatch(type(object))
+    if encoder is not None:
+      yield encoder(object)
     else:
-      raise UnableToSerializeError(type(object))
+      yield from handler(object)
 
   def handle_dictionary(self, d):
     """Called to handle a Dictionary"""
-    i = 0
-    self.start_object()
+    yield self.start_object()
+
+    path = self.path
+    separator = ''
     for key, value in d.items():
-      self.currentLoc += key + '.'
-      #self.stream.write(unicode(self.currentLoc))
-      i += 1
-      self.handle_simple(key)
-      self.stream.write(': ')
-      self.handle_object(value)
-      if i != len(d):
-        self.stream.write(', ')
-      self.currentLoc = self.currentLoc[0:(len(self.currentLoc) - len(key) - 1)]
-    self.end_object()
+      path.append(key)
+      yield from self._handle_value(separator + _encode_key(key) + ': ', value)
+      path.pop()
+      separator = ', '
+
+    yield self.end_object()
 
   def handle_list(self, l):
     """Called to handle a list"""
-    self.start_array()
+    yield self.start_array()
 
+    separator = ''
     for value in l:
-      self.handle_object(value)
-      if l.index(value) != len(l) - 1:
-        self.stream.write(', ')
+      yield from self._handle_value(separator, value)
+      separator = ', '
 
-    self.end_array()
+    yield self.end_array()
+
+  def handle_namedtuple(self, t):
+    """Called to handle a namedtuple, ex: CompleteAddress"""
+    yield from self.handle_dictionary(t._asdict())
+
+  def _handle_value(self, prefix, value):
+    # scalars are glued to the preceding separator so a list of numbers doesn't yield 2 fragments per item
+    dispatch = self._dispatch.get(type(value)) or self.get_dispatch(type(value))
+    if dispatch[0] is not None:
+      yield prefix + dispatch[0](value)
+    else:
+      yield prefix
+      yield from dispatch[1](value)
+
+  def get_dispatch(self, value_type):
+    """Returns an (encoder, handler) pair for a type, one of which is None. Resolved once per type."""
+    dispatch = self._dispatch.get(value_type)
+
+    if dispatch is None:
+      dispatch = self._dispatch[value_type] = self.resolve_dispatch(value_type)
+
+    return dispatch
+
+  def resolve_dispatch(self, value_type):
+    """Walks the type's mro looking for a registered encoder or handler."""
+    for base in value_type.__mro__:
+      if base in self._encoders:
+        return self._encoders[base], None
+      if base in self._handlers:
+        handler = self._handlers[base]
+        if isinstance(handler, str):
+          return None, getattr(self, handler)
+        return None, partial(handler, self)
+
+    if hasattr(value_type, '_asdict'):
+      return None, self.handle_namedtuple
+
+    raise UnableToSerializeError(value_type)
+
+  @classmethod
+  def register_encoder(cls, value_type, encoder):
+    """
+    Registers a function that returns the JSON text for a scalar value, ex: register_encoder(Decimal, str).
+    Registering on a subclass leaves JSONSerializer untouched.
+    """
+    encoders = dict(cls._encoders)
+    encoders[value_type] = encoder
+    cls._encoders = encoders
+
+  @classmethod
+  def register_handler(cls, value_type, handler):
+    """
+    Registers a generator function taking (serializer, value) that yields the value's JSON text in fragments.
+    This is for containers, use register_encoder for scalars.
+    """
+    handlers = dict(cls._handlers)
+    handlers[value_type] = handler
+    cls._handlers = handlers
+
+  @property
+  def currentLoc(self):
+    """The dotted path of the dictionary keys currently being serialized."""
+    return ''.join('{0}.'.format(key) for key in self.path)
 
   def handle_model(self, mod):
     """Called to handle a django Model"""
-    data = str(self.django_json_serializer.serialize([mod]))
-    data = data.lstrip('[').rstrip(']')
+    plan = self.get_model_plan(mod.__class__)
+
+    parts = ['{"pk": ', _json_encoder.encode(mod._get_pk_val()), plan.model_label, '"fields": {']
+    for prefix, handler, field in plan.fields:
+      parts.append(prefix)
+      parts.append(handler(self, mod, field))
+    parts.append('}}')
 
-    self.stream.write(data)
+    yield ''.join(parts)
 
   def handle_queryset(self, queryset):
     """Called to handle a django queryset"""
+    plan = self.get_model_plan(queryset.model)
 
-    data = str(self.django_json_serializer.serialize(queryset))
+    if self.use_natural_keys:
+      natural_fk_names = [field.name for field in plan.fk_fields if hasattr(field.rel.to, 'natural_key')]
+      if natural_fk_names:
+        queryset = queryset.select_related(*natural_fk_names)
 
-    self.stream.write(data)
+    if self.deferredFields:
+      field_names = set(field.name for field in queryset.model._meta.concrete_fields)
+      queryset = queryset.defer(*(self.deferredFields & field_names))
 
-  def handle_field(self, mod, field):
-    """Called to handle each individual (non-relational) field on an object."""
-    self.handle_simple(field.name)
-    if field.get_internal_type() in self.boolean_fields:
-      if field.value_to_string(mod) == 'True':
-        self.stream.write(': true')
-      elif field.value_to_string(mod) == 'False':
-        self.stream.write(': false')
+    if self.chunked and queryset.query.can_filter():
+      batches = _iter_pk_chunks(queryset, self.batch_size)
+    else:
+      # iterator() skips the queryset result cache so rows can be released as soon as they're written
+      batches = _iter_batches(queryset.iterator(), self.batch_size)
+
+    yield self.start_array()
+
+    separator = ''
+    for batch in batches:
+      self.prefetch_m2m_values(plan, batch)
+
+      for mod in batch:
+        yield separator
+        yield from self.handle_model(mod)
+        separator = ', '
+
+    self._m2m_values = {}
+
+    yield self.end_array()
+
+  def prefetch_m2m_values(self, plan, batch):
+    """Loads the m2m values for a batch of objects with one query per field instead of one per object."""
+    self._m2m_values = {}
+
+    if not plan.m2m_fields:
+      return
+
+    pks = [mod._get_pk_val() for mod in batch]
+
+    for field in plan.m2m_fields:
+      through_manager = field.rel.through._default_manager
+      source_name = field.m2m_field_name()
+      target_name = field.m2m_reverse_field_name()
+      through_rows = through_manager.filter(**{source_name + '__in': pks})
+
+      values = dict((pk, []) for pk in pks)
+
+      if self.use_natural_keys and hasattr(field.rel.to, 'natural_key'):
+        source_attname = field.rel.through._meta.get_field(source_name).attname
+        for through_row in through_rows.select_related(target_name):
+          values[getattr(through_row, source_attname)].append(
+            getattr(through_row, target_name).natural_key()
+          )
       else:
-        self.stream.write(': undefined')
+        for source_pk, target_pk in through_rows.values_list(source_name, target_name):
+          values[source_pk].append(smart_text(target_pk, strings_only=True))
+
+      self._m2m_values[field] = values
+
+  def get_model_plan(self, model):
+    """Returns the cached encoding plan for a model class, building it on first use."""
+    key = (self.__class__, model, self.selectedFields, self.ignoredFields, self.deferredFields)
+
+    plan = self._model_plans.get(key)
+    if plan is None:
+      plan = self._model_plans[key] = self.build_model_plan(model)
+
+    return plan
+
+  def build_model_plan(self, model):
+    """
+    Inspects a model's _meta once and returns the fields to write along with the handler for each one.
+    The output matches django's json serializer: {"pk": ..., "model": ..., "fields": {...}}
+    """
+    opts = model._meta.concrete_model._meta
+
+    fields = []
+    fk_fields = []
+    m2m_fields = []
+
+    for field in opts.local_fields:
+      if not field.serialize:
+        continue
+      if field.rel is None:
+        if self._is_field_selected(field.attname):
+          fields.append((field, self.get_field_handler(field)))
+      elif self._is_field_selected(field.attname[:-3]):
+        fields.append((field, self.__class__.handle_fk_field))
+        fk_fields.append(field)
+
+    for field in opts.many_to_many:
+      if field.serialize and field.rel.through._meta.auto_created and self._is_field_selected(field.attname):
+        fields.append((field, self.__class__.handle_m2m_field))
+        m2m_fields.append(field)
+
+    # the separators never change between rows so they're baked into each field's key
+    fields = [
+      ((', ' if i else '') + _json_encoder.encode(field.name) + ': ', handler, field)
+      for i, (field, handler) in enumerate(fields)
+    ]
+
+    return ModelEncodingPlan(
+      ', "model": {0}, '.format(_json_encoder.encode(smart_text(opts))), fields, fk_fields, m2m_fields
+    )
+
+  def get_field_handler(self, field):
+    """Picks the handler for a non-relational field based on its type."""
+    internal_type = field.get_internal_type()
+
+    if internal_type in self.boolean_fields:
+      handler = self.__class__.handle_boolean_field
+    elif internal_type in self.datetime_fields:
+      handler = self.__class__.handle_datetime_field
+    elif internal_type in self.number_fields:
+      handler = self.__class__.handle_number_field
     else:
-      self.stream.write(': ')
-      self.handle_simple(field.value_to_string(mod))
-    self.stream.write(', ')
+      handler = self.__class__.handle_field
+
+    return handler
+
+  def _is_field_selected(self, name):
+    return (self.selectedFields is None or name in self.selectedFields) and \
+           (self.ignoredFields is None or name not in self.ignoredFields) and \
+           (self.deferredFields is None or name not in self.deferredFields)
+
+  def handle_field(self, mod, field):
+    """Called to handle each individual (non-relational) field on an object."""
+    value = getattr(mod, field.attname)
+    if not is_protected_type(value):
+      value = field.value_to_string(mod)
+    return _json_encoder.encode(value)
+
+  def handle_boolean_field(self, mod, field):
+    """Called to handle a boolean field."""
+    try:
+      return _json_booleans[getattr(mod, field.attname)]
+    except KeyError:
+      return self.handle_field(mod, field)
+
+  def handle_datetime_field(self, mod, field):
+    """Called to handle a date, time or datetime field."""
+    return _json_encoder.encode(getattr(mod, field.attname))
+
+  def handle_number_field(self, mod, field):
+    """Called to handle a numeric field."""
+    value = getattr(mod, field.attname)
+    if value.__class__ is int:
+      return str(value)
+    return self.handle_field(mod, field)
 
   def handle_fk_field(self, mod, field):
     """Called to handle a ForeignKey field."""
-    related = getattr(mod, field.name)
-    if related is not None:
-      if field.rel.field_name == related._meta.pk.name:
-        # Related to remote object via primary key
-        pk = related._get_pk_val()
-      else:
-        # Related to remote object via other field
-        pk = getattr(related, field.rel.field_name)
-      d = {
-        'pk': pk,
-      }
-      if self.use_natural_keys and hasattr(related, 'natural_key'):
-        d.update({'natural_key': related.natural_key()})
-      if isinstance(d['pk'], str) and d['pk'].isdigit():
-        d.update({'pk': int(d['pk'])})
-
-      self.handle_simple(field.name)
-      self.stream.write(': ')
-      self.handle_object(d)
-      self.stream.write(', ')
+    if self.use_natural_keys and hasattr(field.rel.to, 'natural_key'):
+      related = getattr(mod, field.name)
+      value = related.natural_key() if related else None
+    else:
+      value = getattr(mod, field.attname)
+    return _json_encoder.encode(value)
 
   def handle_m2m_field(self, mod, field):
     """Called to handle a ManyToManyField."""
-    if field.rel.through._meta.auto_created:
-      self.handle_simple(field.name)
-      self.stream.write(': ')
-      self.start_array()
-      hasRelationships = False
-      for relobj in getattr(mod, field.name).iterator():
-        hasRelationships = True
-        pk = relobj._get_pk_val()
-        d = {
-          'pk': pk,
-        }
-        if self.use_natural_keys and hasattr(relobj, 'natural_key'):
-          d.update({'natural_key': relobj.natural_key()})
-        if isinstance(d['pk'], str) and d['pk'].isdigit():
-          d.update({'pk': int(d['pk'])})
-
-        self.handle_simple(d)
-        self.stream.write(', ')
-      if hasRelationships:
-        self.stream.seek(self.stream.tell() - 2)
-      self.end_array()
-      self.stream.write(', ')
-
-  def handle_simple(self, simple):
-    """ Called to handle values that can be handled via simplejson """
-    self.stream.write(str(dumps(simple)))
-
-  def handle_date(self, date):
-    """ Called to handle values that can be handled via date ISO """
-    self.handle_simple(date.isoformat())
+    prefetched_values = self._m2m_values.get(field)
+    if prefetched_values is not None:
+      value = prefetched_values[mod._get_pk_val()]
+    elif self.use_natural_keys and hasattr(field.rel.to, 'natural_key'):
+      value = [related.natural_key() for related in getattr(mod, field.name).iterator()]
+    else:
+      value = [smart_text(related._get_pk_val(), strings_only=True)
+               for related in getattr(mod, field.name).iterator()]
+    return _json_encoder.encode(value)
 
   def getvalue(self):
     """Return the fully serialized object (or None if the output stream is  not seekable).sss """
     if isinstance(getattr(self.stream, 'getvalue', None), collections.Callable):
       return self.stream.getvalue()
+
+  # scalar types map to functions returning JSON text, containers map to handler method names
+  _encoders = {
+    str: encode_basestring_ascii,
+    bool: _json_booleans.__getitem__,
+    int: int.__repr__,
+    float: _encode_float,
+    type(None): _json_booleans.__getitem__,
+    date: _encode_isoformat,
+    time: _encode_isoformat,
+    Decimal: _encode_as_string,
+    UUID: _encode_as_string,
+  }
+  _handlers = {
+    dict: 'handle_dictionary',
+    list: 'handle_list',
+    Model: 'handle_model',
+    QuerySet: 'handle_queryset',
+  }
+
+
+def _iter_batches(iterable, batch_size):
+  batch = []
+  for item in iterable:
+    batch.append(item)
+    if len(batch) == batch_size:
+      yield batch
+      batch = []
+  if batch:
+    yield batch
+
+
+def _iter_pk_chunks(queryset, chunk_size):
+  # keyset pagination: every chunk is its own query, so memory depends on chunk_size rather than table size
+  queryset = queryset.order_by('pk')
+  chunk = list(queryset[:chunk_size])
+
+  while chunk:
+    yield chunk
+
+    if len(chunk) < chunk_size:
+      break
+
+    chunk = list(queryset.filter(pk__gt=chunk[-1].pk)[:chunk_size])
+
+
+def _as_frozenset(names):
+  return frozenset(names) if names is not None else None
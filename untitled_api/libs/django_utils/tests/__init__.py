@@ -8,5 +8,27 @@ class FakeTestClass(models.Model):
   url = models.URLField()
   trusted_geo_data = models.BooleanField()
 
+  def natural_key(self):
+    return (self.url,)
+
+  def __unicode__(self):
+    return self.name
+
+
+class FakeTestTag(models.Model):
+  name = models.CharField(max_length=200)
+
+  def natural_key(self):
+    return (self.name,)
+
+  def __unicode__(self):
+    return self.name
+
+
+class FakeRelatedTestClass(models.Model):
+  name = models.CharField(max_length=200)
+  test_class = models.ForeignKey(FakeTestClass)
+  tags = models.ManyToManyField(FakeTestTag)
+
   def __unicode__(self):
     return self.name
@@ -0,0 +1,30 @@
+import json
+import timeit
+
+from untitled_api.libs.django_utils.serialization.flexible_json_serializer import JSONSerializer
+
+
+def _build_payload(value_count):
+  # each listing holds 10 scalar values, nested roughly like our listing exports
+  return {'listings': [
+    {'id': i, 'price': 2695.0 + i, 'title': 'Listing #{0}'.format(i), 'broker_fee': i % 2 == 0, 'lat': 40.6942608,
+     'lng': -73.9523367, 'address': None, 'tags': ['doorman', 'laundry'], 'attrs': {'bedroom_count': i % 4}}
+    for i in range(value_count // 10)
+  ]}
+
+
+def test_serializer_throughput_on_nested_payload(capsys):
+  value_count = 100000
+  payload = _build_payload(value_count)
+
+  assert json.loads(JSONSerializer().serialize(payload)) == payload
+
+  seconds = min(timeit.repeat(lambda: JSONSerializer().serialize(payload), number=1, repeat=3))
+  stream_seconds = min(timeit.repeat(lambda: sum(1 for _ in JSONSerializer().stream_serialize(payload)), number=1,
+                                     repeat=3))
+  json_seconds = min(timeit.repeat(lambda: json.dumps(payload), number=1, repeat=3))
+
+  with capsys.disabled():
+    print('\nJSONSerializer.serialize: {0:,.0f} values/s'.format(value_count / seconds))
+    print('JSONSerializer.stream_serialize: {0:,.0f} values/s'.format(value_count / stream_seconds))
+    print('json.dumps (reference): {0:,.0f} values/s'.format(value_count / json_seconds))
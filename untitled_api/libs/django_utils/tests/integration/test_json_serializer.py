@@ -1,8 +1,11 @@
 import json
 
 import pytest
+from django.core import serializers
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from untitled_api.libs.django_utils.serialization.flexible_json_serializer import JSONSerializer
-from untitled_api.libs.django_utils.tests import FakeTestClass
+from untitled_api.libs.django_utils.tests import FakeTestClass, FakeTestTag, FakeRelatedTestClass
 
 
 @pytest.mark.django_db_with_migrations
@@ -17,3 +20,85 @@ def test_serializer_serializes_queryset_correctly():
   serialized_data = serializer.serialize(dict_data)
   deserialized_data = json.loads(serialized_data)
   assert deserialized_data["test_models"][0]["model"] == 'django_utils.faketestclass'
+
+
+@pytest.mark.django_db_with_migrations
+def test_serializer_serializes_queryset_like_django():
+  FakeTestClass(name='Some Name', id=1, url='http://www.test.com', trusted_geo_data=False).save()
+  FakeTestClass(name='Some Name 2', id=2, url='http://www2.test.com', trusted_geo_data=True).save()
+
+  serialized_data = JSONSerializer().serialize(FakeTestClass.objects.all())
+
+  assert json.loads(serialized_data) == json.loads(serializers.serialize('json', FakeTestClass.objects.all()))
+
+
+@pytest.fixture
+def related_test_classes():
+  test_class = FakeTestClass(name='Some Name', id=1, url='http://www.test.com', trusted_geo_data=False)
+  test_class.save()
+  tags = [FakeTestTag.objects.create(name='tag {0}'.format(i)) for i in range(3)]
+
+  for i in range(10):
+    related_test_class = FakeRelatedTestClass.objects.create(name='related {0}'.format(i), test_class=test_class)
+    related_test_class.tags.add(*tags[:i % 4])
+
+
+def _sort_tags(deserialized_data):
+  for obj in deserialized_data:
+    obj['fields']['tags'].sort()
+  return deserialized_data
+
+
+@pytest.mark.django_db_with_migrations
+def test_serializer_serializes_relations_like_django(related_test_classes):
+  serialized_data = JSONSerializer().serialize(FakeRelatedTestClass.objects.all())
+
+  assert _sort_tags(json.loads(serialized_data)) == \
+         _sort_tags(json.loads(serializers.serialize('json', FakeRelatedTestClass.objects.all())))
+
+
+@pytest.mark.django_db_with_migrations
+@pytest.mark.parametrize("use_natural_keys", [False, True])
+def test_serializer_loads_relations_once_per_batch(related_test_classes, use_natural_keys):
+  with CaptureQueriesContext(connection) as queries:
+    JSONSerializer().serialize(FakeRelatedTestClass.objects.all(), use_natural_keys=use_natural_keys)
+
+  # the queryset itself plus one query for the tags
+  assert len(queries) == 2
+
+  with CaptureQueriesContext(connection) as queries:
+    JSONSerializer().serialize(FakeRelatedTestClass.objects.all(), use_natural_keys=use_natural_keys, batch_size=4)
+
+  assert len(queries) == 4
+
+
+@pytest.mark.django_db_with_migrations
+def test_serializer_serializes_natural_keys(related_test_classes):
+  serialized_data = JSONSerializer().serialize(FakeRelatedTestClass.objects.all(), use_natural_keys=True)
+
+  deserialized_data = json.loads(serialized_data)
+  assert deserialized_data[3]['fields']['test_class'] == ['http://www.test.com']
+  assert deserialized_data[3]['fields']['tags'] == [['tag 0'], ['tag 1'], ['tag 2']]
+
+
+@pytest.mark.django_db_with_migrations
+def test_serializer_reads_chunked_queryset_by_pk(related_test_classes):
+  serialized_data = JSONSerializer().serialize(FakeRelatedTestClass.objects.all(), chunked=True, batch_size=3)
+
+  with CaptureQueriesContext(connection) as queries:
+    JSONSerializer().serialize(FakeRelatedTestClass.objects.all(), chunked=True, batch_size=3)
+
+  assert json.loads(serialized_data) == json.loads(JSONSerializer().serialize(FakeRelatedTestClass.objects.all()))
+  # 4 chunks of rows, each followed by its tags query
+  assert len(queries) == 8
+
+
+@pytest.mark.django_db_with_migrations
+def test_serializer_leaves_out_deferred_fields(related_test_classes):
+  with CaptureQueriesContext(connection) as queries:
+    serialized_data = JSONSerializer().serialize(FakeRelatedTestClass.objects.all(), chunked=True, defer=['name'])
+
+  deserialized_data = json.loads(serialized_data)
+  assert len(queries) == 2
+  assert 'name' not in deserialized_data[0]['fields']
+  assert deserialized_data[0]['model'] == 'django_utils.fakerelatedtestclass'
@@ -1,8 +1,13 @@
 import datetime
 import json
+from decimal import Decimal
+from uuid import UUID
 
 from dateutil.tz import tzoffset
-from untitled_api.libs.django_utils.serialization.flexible_json_serializer import JSONSerializer
+import pytest
+from untitled_api.libs.geo_utils.complete_address import CompleteAddress
+from untitled_api.libs.django_utils.serialization.flexible_json_serializer import JSONSerializer, \
+  UnableToSerializeError
 from untitled_api.libs.django_utils.tests import FakeTestClass
 
 
@@ -37,3 +42,96 @@ def test_serializer_serializes_model_correctly():
   serialized_data = serializer.serialize(dict_data)
   deserialized_data = json.loads(serialized_data)
   assert deserialized_data["test_model"]["model"] == 'django_utils.faketestclass'
+
+
+def test_serializer_streams_same_document_as_serialize():
+  test_class = FakeTestClass(name='Some Name', id=1, url='http://www.test.com', trusted_geo_data=False)
+  dict_data = {'test_model': test_class, 'values': [1, 2, 'three', None]}
+
+  serialized_data = JSONSerializer().serialize(dict_data)
+  streamed_data = ''.join(JSONSerializer().stream_serialize(dict_data))
+
+  assert json.loads(streamed_data) == json.loads(serialized_data)
+
+
+def test_serializer_streams_in_chunks():
+  dict_data = {'values': list(range(100))}
+
+  chunks = list(JSONSerializer().stream_serialize(dict_data, chunk_size=16))
+
+  assert len(chunks) > 1
+  assert json.loads(''.join(chunks)) == dict_data
+
+
+def test_serializer_reuses_model_plan():
+  test_class = FakeTestClass(name='Some Name', id=1, url='http://www.test.com', trusted_geo_data=False)
+
+  first_serializer = JSONSerializer()
+  first_serializer.serialize({'test_model': test_class})
+  second_serializer = JSONSerializer()
+  second_serializer.serialize({'test_model': test_class})
+
+  assert first_serializer.get_model_plan(FakeTestClass) is second_serializer.get_model_plan(FakeTestClass)
+
+
+def test_serializer_serializes_model_fields():
+  test_class = FakeTestClass(name='Some Name', id=1, url='http://www.test.com', trusted_geo_data=True)
+
+  deserialized_data = json.loads(JSONSerializer().serialize(test_class))
+
+  assert deserialized_data == {
+    'pk': 1, 'model': 'django_utils.faketestclass',
+    'fields': {'name': 'Some Name', 'url': 'http://www.test.com', 'trusted_geo_data': True}
+  }
+
+
+def test_serializer_serializes_selected_model_fields():
+  test_class = FakeTestClass(name='Some Name', id=1, url='http://www.test.com', trusted_geo_data=True)
+
+  deserialized_data = json.loads(JSONSerializer().serialize(test_class, fields=['name'], ignored=['url']))
+
+  assert deserialized_data['fields'] == {'name': 'Some Name'}
+
+
+def test_serializer_serializes_list_with_duplicates():
+  values = [1, 1, True, 'a', 'a', None, None, 1.5]
+
+  assert json.loads(JSONSerializer().serialize(values)) == values
+
+
+def test_serializer_serializes_nested_structures():
+  data = {'a': [{'b': [1, 2, {'c': None}]}, [], {}], 'd': {'e': 'f'}, 1: 'int key'}
+
+  assert json.loads(JSONSerializer().serialize(data)) == json.loads(json.dumps(data))
+
+
+@pytest.mark.parametrize(("input_values", "expected"), [
+  (Decimal('1.50'), '1.50'),
+  (UUID('12345678123456781234567812345678'), '12345678-1234-5678-1234-567812345678'),
+  (datetime.date(2013, 8, 29), '2013-08-29'),
+  (datetime.datetime(2013, 8, 29, 12, 55), '2013-08-29T12:55:00'),
+  (datetime.time(12, 55), '12:55:00'),
+])
+def test_serializer_serializes_registered_scalars(input_values, expected):
+  assert json.loads(JSONSerializer().serialize([input_values])) == [expected]
+
+
+def test_serializer_serializes_namedtuple():
+  address = CompleteAddress(1.5, 2.5, '1 Main St', None, 'Brooklyn', 'NY', '11205', '1 Main St, Brooklyn, NY 11205')
+
+  assert json.loads(JSONSerializer().serialize(address)) == address._asdict()
+
+
+def test_serializer_uses_registered_encoder():
+  class DecimalAsNumberSerializer(JSONSerializer):
+    pass
+
+  DecimalAsNumberSerializer.register_encoder(Decimal, str)
+
+  assert DecimalAsNumberSerializer().serialize([Decimal('1.50')]) == '[1.50]'
+  assert JSONSerializer().serialize([Decimal('1.50')]) == '["1.50"]'
+
+
+def test_serializer_raises_for_unknown_type():
+  with pytest.raises(UnableToSerializeError):
+    JSONSerializer().serialize({'a': object()})
@@ -0,0 +1,33 @@
+from untitled_api.libs.geo_utils.parsing.address_parser import get_canonical_address_key
+
+
+class AddressIndex(object):
+  """
+  CompleteAddress records by canonical address key, so ingest can tell with one dict lookup whether an address is
+  already known, however the listing wrote it.
+  """
+
+  def __init__(self, complete_addresses=()):
+    self.complete_addresses_by_key = {}
+
+    for complete_address in complete_addresses:
+      self.add(complete_address)
+
+  def add(self, complete_address, address_str=None):
+    """
+    Indexes complete_address by its formatted_address, and by address_str when given, like the string it was
+    geocoded from.
+    """
+    self.complete_addresses_by_key[get_canonical_address_key(complete_address.formatted_address)] = complete_address
+
+    if address_str:
+      self.complete_addresses_by_key[get_canonical_address_key(address_str)] = complete_address
+
+  def get(self, address_str, default=None):
+    return self.complete_addresses_by_key.get(get_canonical_address_key(address_str), default)
+
+  def __contains__(self, address_str):
+    return get_canonical_address_key(address_str) in self.complete_addresses_by_key
+
+  def __len__(self):
+    return len(self.complete_addresses_by_key)
@@ -0,0 +1,99 @@
+from collections import defaultdict, namedtuple
+from itertools import chain
+import math
+import numpy
+from untitled_api.libs.geo_utils.services.geo_distance_service import km_distances, radius
+
+km_per_degree_lat = math.radians(radius)
+
+# a point found by a radius search, with its km distance from the origin
+SpatialMatch = namedtuple('SpatialMatch', 'key km_distance')
+
+
+class GridIndex(object):
+  """
+  Points by key on a grid of cell_degrees square cells, so radius and bounding box searches only look at the points in
+  the cells they overlap. Inserting or deleting a point is O(1). The grid is in plain degrees, so searches don't wrap
+  around the antimeridian.
+  """
+
+  def __init__(self, cell_degrees=0.005):
+    self.cell_degrees = cell_degrees
+    self.points = {}
+    # cell: {key: (lat, lng)}
+    self.cells = defaultdict(dict)
+
+  def insert(self, key, lat, lng):
+    """Adds a point, or moves it when key is already in the index."""
+    if key in self.points:
+      self.delete(key)
+
+    self.points[key] = (lat, lng)
+    self.cells[self._get_cell(lat, lng)][key] = (lat, lng)
+
+  def delete(self, key):
+    lat, lng = self.points.pop(key)
+    cell = self._get_cell(lat, lng)
+
+    del self.cells[cell][key]
+    if not self.cells[cell]:
+      del self.cells[cell]
+
+  def within_bbox(self, min_lat, min_lng, max_lat, max_lng):
+    """Returns the keys of the points inside the box, in no particular order."""
+    return [key for cell_points in self._get_cells_points(min_lat, min_lng, max_lat, max_lng)
+            for key, (lat, lng) in cell_points.items() if min_lat <= lat <= max_lat and min_lng <= lng <= max_lng]
+
+  def within_radius(self, origin, km):
+    """Returns a SpatialMatch per point within km of origin, a (lat, lng), nearest first."""
+    lat_degrees = km / km_per_degree_lat
+    # the circle is widest in longitude north or south of the origin, not on its parallel. Once it reaches over a pole
+    # it spans every longitude.
+    angular_radius = km / radius
+    cos_lat = math.cos(math.radians(origin[0]))
+    sin_lng_radius = math.sin(angular_radius) / cos_lat if cos_lat > 0 else 1
+    if sin_lng_radius < 1 and angular_radius < math.pi / 2:
+      lng_degrees = math.degrees(math.asin(sin_lng_radius))
+      min_lng, max_lng = origin[1] - lng_degrees, origin[1] + lng_degrees
+    else:
+      # the grid doesn't wrap, so origin[1] +- 180 would miss the far side
+      min_lng, max_lng = -180, 180
+
+    keys = []
+    points = []
+    for cell_points in self._get_cells_points(origin[0] - lat_degrees, min_lng, origin[0] + lat_degrees, max_lng):
+      keys.extend(cell_points.keys())
+      points.extend(cell_points.values())
+
+    if not points:
+      return []
+
+    # the cells are only a prefilter, the exact distances are computed in one vectorized pass. fromiter over the
+    # flattened coordinates is a good deal quicker than numpy converting the list of pairs.
+    distances = km_distances(origin, numpy.fromiter(chain.from_iterable(points), numpy.float64, 2 * len(points)))
+    indexes = numpy.flatnonzero(distances <= km)
+    indexes = indexes[numpy.argsort(distances[indexes], kind='mergesort')]
+
+    return [SpatialMatch(keys[i], distance) for i, distance in zip(indexes.tolist(), distances[indexes].tolist())]
+
+  def _get_cell(self, lat, lng):
+    return int(math.floor(lat / self.cell_degrees)), int(math.floor(lng / self.cell_degrees))
+
+  def _get_cells_points(self, min_lat, min_lng, max_lat, max_lng):
+    min_row, min_column = self._get_cell(min_lat, min_lng)
+    max_row, max_column = self._get_cell(max_lat, max_lng)
+
+    # a box covering more cells than hold points is cheaper to check against the occupied cells
+    if (max_row - min_row + 1) * (max_column - min_column + 1) > len(self.cells):
+      return [cell_points for (row, column), cell_points in self.cells.items()
+              if min_row <= row <= max_row and min_column <= column <= max_column]
+
+    cells = self.cells
+    return [cells[(row, column)] for row in range(min_row, max_row + 1) for column in range(min_column, max_column + 1)
+            if (row, column) in cells]
+
+  def __len__(self):
+    return len(self.points)
+
+  def __contains__(self, key):
+    return key in self.points
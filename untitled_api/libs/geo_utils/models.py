@@ -0,0 +1,22 @@
+from django.db import models
+
+
+class GeocodedAddress(models.Model):
+  """The database tier of the geocode cache, see geocode_cache.GeocodeCache."""
+  address_key = models.CharField(max_length=40, unique=True)
+
+  lat = models.FloatField(blank=True, null=True)
+  lng = models.FloatField(blank=True, null=True)
+  address1 = models.CharField(max_length=255, blank=True, null=True)
+  address2 = models.CharField(max_length=255, blank=True, null=True)
+  city = models.CharField(max_length=255, blank=True, null=True)
+  state = models.CharField(max_length=255, blank=True, null=True)
+  zip_code = models.CharField(max_length=255, blank=True, null=True)
+  formatted_address = models.TextField(blank=True, null=True)
+  # set instead of the address fields when google couldn't geocode the address
+  failure_status = models.CharField(max_length=255, blank=True, null=True)
+
+  expires_date = models.DateTimeField()
+
+  created_date = models.DateTimeField(auto_now_add=True)
+  changed_date = models.DateTimeField(auto_now=True)
@@ -12,6 +12,20 @@ well_formatted_pattern = re.compile(
   r'(?P<state>\w{2})\s+'
   r'(?P<zip_code>\d{5})'
 )
+cross_street_separator_pattern = re.compile(r'\s+(?:and|at|&)\s+')
+address_key_token_pattern = re.compile(r'[a-z0-9]+')
+# the unit of an address key, like "apt 4a", "unit 12-3" or "#4". The keyword must be a whole word, so "ste" isn't
+# found in "steuben st".
+address_key_unit_pattern = re.compile(
+  r'(?:#|\b(?:apartment|apt|unit|suite|ste)\b)\s*#?\s*(?P<unit>[a-z0-9]+(?:-[a-z0-9]+)*)'
+)
+
+# spellings reduced to one for canonical address keys, by lowercase word
+address_abbreviations = {
+  'street': 'st', 'avenue': 'ave', 'av': 'ave', 'place': 'pl', 'boulevard': 'blvd', 'road': 'rd', 'drive': 'dr',
+  'lane': 'ln', 'court': 'ct', 'parkway': 'pkwy', 'terrace': 'ter', 'square': 'sq', 'highway': 'hwy',
+  'east': 'e', 'west': 'w', 'north': 'n', 'south': 's',
+}
 
 def is_street_address(address):
   address_split = [address_part for address_part in address.split() if address_part not in ("and", "at")]
@@ -68,3 +82,45 @@ def parse_address(address_str):
     zip_code=zip_code, formatted_address=formatted_address
   )
   return complete_address
+
+
+def get_canonical_address_key(address_str):
+  """
+  Returns a key shared by the ways listings write one address. Case, punctuation, street suffix and direction
+  abbreviations, the spelling of the unit ("Apt. 4A", "#4a"), the order of cross streets and a neighborhood given with
+  " in " don't change it.
+  """
+  # parse_address doesn't expect abbreviations to end in a period
+  address_str = address_str.lower().replace('.', '')
+
+  unit_key = None
+  unit_match = address_key_unit_pattern.search(address_str)
+  if unit_match:
+    address_str = address_str[:unit_match.start()] + ' ' + address_str[unit_match.end():]
+    unit_key = '#' + unit_match.group('unit')
+    # a unit between commas, like "123 main st, apt 4a, new york", leaves an empty part that would hide the street
+    address_str = ','.join(part for part in address_str.split(',') if part.strip())
+
+  street, _, rest = address_str.partition(',')
+  street_parts = cross_street_separator_pattern.split(street)
+
+  # "building name at 123 main st" is a street address that parse_address handles
+  if is_cross_street_address(street) and not any(is_street_address(part) for part in street_parts):
+    street_key = join_cross_street(sorted(_get_tokens_key(part) for part in street_parts))
+  else:
+    try:
+      complete_address = parse_address(address_str)
+      # the street part of the pattern can match only spaces, the street before the first comma is better than none
+      if complete_address.address1.strip():
+        street = complete_address.address1
+        rest = ' '.join((complete_address.city, complete_address.state, complete_address.zip_code))
+    except ValueError:
+      pass
+
+    street_key = _get_tokens_key(street)
+
+  return ' '.join(key for key in (street_key, unit_key, _get_tokens_key(rest)) if key)
+
+
+def _get_tokens_key(address_part):
+  return ' '.join(address_abbreviations.get(t, t) for t in address_key_token_pattern.findall(address_part))
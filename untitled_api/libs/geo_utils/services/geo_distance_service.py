@@ -1,7 +1,13 @@
 #https://gist.github.com/rochacbruno/2883505
+from collections import namedtuple
 import math
+import numpy
 
 radius = 6371 # km
+
+# indexes into the points passed to k_nearest, nearest first, and the km distance to each
+NearestPoints = namedtuple('NearestPoints', 'indexes km_distances')
+
 def km_distance(origin, destination):
   lat1, lon1 = origin
   lat2, lon2 = destination
@@ -14,3 +20,55 @@ def km_distance(origin, destination):
   d = radius * c
 
   return d
+
+
+def km_distances(origin, points):
+  """km_distance from origin to each (lat, lng) of points, as a numpy array, in one vectorized pass."""
+  lats, lngs = _to_radians(points)
+  return _haversine(math.radians(origin[0]), math.radians(origin[1]), lats, lngs)
+
+
+def km_distance_matrix(origins, destinations=None):
+  """
+  Returns the array where [i, j] is km_distance(origins[i], destinations[j]), destinations defaulting to origins. It
+  holds len(origins) * len(destinations) floats, so chunk the origins for large inputs.
+  """
+  origin_lats, origin_lngs = _to_radians(origins)
+  destination_lats, destination_lngs = (origin_lats, origin_lngs) if destinations is None else _to_radians(destinations)
+
+  return _haversine(origin_lats[:, numpy.newaxis], origin_lngs[:, numpy.newaxis], destination_lats, destination_lngs)
+
+
+def k_nearest(origin, points, k):
+  """Returns NearestPoints for the k points nearest to origin. Only the k nearest get sorted, not all the points."""
+  distances = km_distances(origin, points)
+
+  if k < len(distances):
+    indexes = numpy.argpartition(distances, max(k, 0))[:max(k, 0)]
+  else:
+    indexes = numpy.arange(len(distances))
+
+  # stable, so equally distant points keep the order they were passed in
+  indexes = indexes[numpy.argsort(distances[indexes], kind='mergesort')]
+
+  return NearestPoints(indexes, distances[indexes])
+
+
+def _to_radians(points):
+  points = numpy.radians(numpy.asarray(points, dtype=numpy.float64).reshape(-1, 2))
+  return points[:, 0], points[:, 1]
+
+
+def _haversine(lats1, lngs1, lats2, lngs2):
+  # km_distance's formula, with the intermediate arrays reused where they can be
+  a = numpy.sin((lats2 - lats1) / 2)
+  a *= a
+  sin_dlng = numpy.sin((lngs2 - lngs1) / 2)
+  sin_dlng *= sin_dlng
+  sin_dlng *= numpy.cos(lats1) * numpy.cos(lats2)
+  a += sin_dlng
+
+  c = numpy.arctan2(numpy.sqrt(a), numpy.sqrt(1 - a))
+  c *= 2 * radius
+
+  return c
@@ -1,10 +1,21 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import itertools
 import sys
-from pygeocoder import Geocoder
+from django.conf import settings
+from pygeocoder import Geocoder, GeocoderError
 from untitled_api.libs.geo_utils.complete_address import CompleteAddress
-from untitled_api.libs.geo_utils.signals import location_geocoded
+from untitled_api.libs.geo_utils.services.geocode_cache import GeocodeFailure, geocode_cache, get_address_key
+from untitled_api.libs.geo_utils.signals import location_geocoded, geocode_over_limit
+from untitled_api.libs.python_utils.concurrency.token_bucket import TokenBucket
 
 
 _geocoder = Geocoder()
+# shared by every geocode_many call in the process
+geocode_rate_limiter = TokenBucket(settings.GEOCODE_QUERIES_PER_SECOND)
+# google answers these the same way every time, so they're cached like an address. Anything else, like going over
+# the query limit, is worth trying again.
+cacheable_failure_statuses = frozenset([GeocoderError.G_GEO_ZERO_RESULTS, GeocoderError.G_GEO_MISSING_QUERY])
 
 
 def _get_address_component(address_components, component):
@@ -16,7 +27,108 @@ def _get_address_component(address_components, component):
   return ret_val
 
 
-def get_geocoded_address(address_str):
+def get_geocoded_address(address_str, _geocoder=None, _geocode_cache=None):
+  """
+  Returns the CompleteAddress google geocodes address_str to, raising GeocoderError when it can't. Answers are
+  cached by get_address_key(address_str), see geocode_cache.GeocodeCache.
+  """
+  # the module level defaults are looked up on each call, so patching them still works
+  current_module = sys.modules[__name__]
+  _geocoder = current_module._geocoder if _geocoder is None else _geocoder
+  _geocode_cache = current_module.geocode_cache if _geocode_cache is None else _geocode_cache
+
+  address_key = get_address_key(address_str)
+
+  ret_val = _geocode_cache.get(address_key)
+
+  if ret_val is None:
+    ret_val = _geocode_or_failure(address_str, _geocoder)
+    _geocode_cache.set(address_key, ret_val)
+
+  if isinstance(ret_val, GeocodeFailure):
+    raise GeocoderError(ret_val.status)
+
+  return ret_val
+
+
+def geocode_many(address_strs, max_workers=None, _geocoder=None, _geocode_cache=None, _rate_limiter=None):
+  """
+  Returns a CompleteAddress per address string, in order, or None where google couldn't geocode it. Each distinct
+  address key is geocoded once, uncached ones by max_workers threads that together stay under
+  GEOCODE_QUERIES_PER_SECOND. An address over the query limit is retried after a backoff, and GeocoderError is raised
+  once it's out of retries. Whatever was geocoded by then is cached, so running it again picks up where it stopped.
+  """
+  current_module = sys.modules[__name__]
+  _geocoder = current_module._geocoder if _geocoder is None else _geocoder
+  _geocode_cache = current_module.geocode_cache if _geocode_cache is None else _geocode_cache
+
+  address_strs = list(address_strs)
+  results_by_key = {}
+  uncached_address_strs = OrderedDict()
+
+  for address_str in address_strs:
+    address_key = get_address_key(address_str)
+
+    if address_key not in results_by_key and address_key not in uncached_address_strs:
+      cached = _geocode_cache.get(address_key)
+
+      if cached is None:
+        uncached_address_strs[address_key] = address_str
+      else:
+        results_by_key[address_key] = cached
+
+  if uncached_address_strs:
+    rate_limiter = _rate_limiter or geocode_rate_limiter
+
+    # the threads only talk to google, the cache is only used from this thread
+    with ThreadPoolExecutor(max_workers or settings.GEOCODE_MAX_WORKERS) as executor:
+      address_keys_by_future = {
+        executor.submit(_geocode_with_backoff, address_str, _geocoder, rate_limiter): address_key
+        for address_key, address_str in uncached_address_strs.items()
+      }
+
+      try:
+        for future in as_completed(address_keys_by_future):
+          address_key = address_keys_by_future[future]
+          results_by_key[address_key] = future.result()
+          _geocode_cache.set(address_key, results_by_key[address_key])
+      except Exception:
+        for future in address_keys_by_future:
+          future.cancel()
+        raise
+
+  return [None if isinstance(result, GeocodeFailure) else result
+          for result in (results_by_key[get_address_key(address_str)] for address_str in address_strs)]
+
+
+def _geocode_with_backoff(address_str, _geocoder, rate_limiter):
+  for attempt in itertools.count():
+    rate_limiter.acquire()
+
+    try:
+      return _geocode_or_failure(address_str, _geocoder)
+    except GeocoderError as e:
+      if e.status != GeocoderError.G_GEO_OVER_QUERY_LIMIT or attempt >= settings.GEOCODE_OVER_LIMIT_RETRIES:
+        raise
+
+      # every thread waits, not only this one, since they all share the one limit
+      rate_limiter.pause(settings.GEOCODE_OVER_LIMIT_BACKOFF * 2 ** attempt)
+
+
+def _geocode_or_failure(address_str, _geocoder):
+  """Returns the CompleteAddress for address_str, or a GeocodeFailure when google's answer is worth caching."""
+  try:
+    return _geocode(address_str, _geocoder)
+  except GeocoderError as e:
+    if e.status in cacheable_failure_statuses:
+      return GeocodeFailure(e.status)
+
+    if e.status == GeocoderError.G_GEO_OVER_QUERY_LIMIT:
+      geocode_over_limit.send(sys.modules[__name__])
+    raise
+
+
+def _geocode(address_str, _geocoder):
   results = _geocoder.geocode(address_str)
 
   current_module = sys.modules[__name__]
@@ -0,0 +1,140 @@
+from collections import namedtuple
+from datetime import datetime
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+from untitled_api.libs.geo_utils.complete_address import CompleteAddress
+from untitled_api.libs.geo_utils.models import GeocodedAddress
+from untitled_api.libs.geo_utils.parsing.address_parser import get_canonical_address_key
+from untitled_api.libs.python_utils.collections.lru_cache import LRUCache
+
+# cached in place of a CompleteAddress when google couldn't geocode the address, status is the GeocoderError status
+GeocodeFailure = namedtuple('GeocodeFailure', 'status')
+GeocodeCacheStats = namedtuple('GeocodeCacheStats', 'local_hits shared_hits db_hits misses hit_rate')
+
+
+def get_address_key(address_str):
+  """Address strings that address_parser considers the same address get the same key."""
+  return get_canonical_address_key(address_str)
+
+
+class GeocodeCache(object):
+  """
+  CompleteAddress or GeocodeFailure per address key, kept in an in-process LRUCache in front of the django cache
+  named by GEOCODE_CACHE_ALIAS, and with GEOCODE_CACHE_USE_DB also in the GeocodedAddress table. Entries expire
+  GEOCODE_CACHE_TIMEOUT seconds after they're set, failures after GEOCODE_FAILURE_CACHE_TIMEOUT. A hit in a slower
+  tier is copied into the faster ones.
+  """
+
+  def __init__(self, max_size=None, shared_cache=None, use_db=None, timeout=None, failure_timeout=None,
+               _now=time.time):
+    self.local_cache = LRUCache(max_size or settings.GEOCODE_CACHE_MAX_SIZE)
+    self._shared_cache = shared_cache
+    self.use_db = settings.GEOCODE_CACHE_USE_DB if use_db is None else use_db
+    self.timeout = timeout or settings.GEOCODE_CACHE_TIMEOUT
+    self.failure_timeout = failure_timeout or settings.GEOCODE_FAILURE_CACHE_TIMEOUT
+    self._now = _now
+
+    self.local_hits = 0
+    self.shared_hits = 0
+    self.db_hits = 0
+    self.misses = 0
+    self._stats_lock = threading.Lock()
+
+  @property
+  def shared_cache(self):
+    # django cache connections are per thread, so this is looked up on each use
+    return self._shared_cache or caches[settings.GEOCODE_CACHE_ALIAS]
+
+  def get(self, address_key):
+    """Returns the CompleteAddress or GeocodeFailure cached for address_key, or None."""
+    now = self._now()
+
+    entry = self.local_cache.get(address_key)
+    if entry and entry[0] > now:
+      self._count('local_hits')
+      return entry[1]
+
+    hashed_key = _hash_address_key(address_key)
+
+    entry = self.shared_cache.get('geocode:' + hashed_key)
+    if entry and entry[0] > now:
+      self._count('shared_hits')
+      self.local_cache.set(address_key, entry)
+      return entry[1]
+
+    if self.use_db:
+      entry = _get_db_entry(hashed_key, now)
+      if entry:
+        self._count('db_hits')
+        self.shared_cache.set('geocode:' + hashed_key, entry, entry[0] - now)
+        self.local_cache.set(address_key, entry)
+        return entry[1]
+
+    self._count('misses')
+    return None
+
+  def set(self, address_key, value):
+    """Caches a CompleteAddress, or a GeocodeFailure for the shorter failure timeout."""
+    timeout = self.failure_timeout if isinstance(value, GeocodeFailure) else self.timeout
+    entry = (self._now() + timeout, value)
+    hashed_key = _hash_address_key(address_key)
+
+    self.local_cache.set(address_key, entry)
+    self.shared_cache.set('geocode:' + hashed_key, entry, timeout)
+
+    if self.use_db:
+      _set_db_entry(hashed_key, entry)
+
+  def stats(self):
+    hits = self.local_hits + self.shared_hits + self.db_hits
+    lookups = hits + self.misses
+    return GeocodeCacheStats(self.local_hits, self.shared_hits, self.db_hits, self.misses,
+                             hits / lookups if lookups else 0.0)
+
+  def _count(self, counter):
+    with self._stats_lock:
+      setattr(self, counter, getattr(self, counter) + 1)
+
+
+def _hash_address_key(address_key):
+  # a fixed length key without spaces works with every cache backend and fits GeocodedAddress.address_key
+  return hashlib.sha1(address_key.encode('utf-8')).hexdigest()
+
+
+def _get_db_entry(hashed_key, now):
+  row = GeocodedAddress.objects.filter(address_key=hashed_key, expires_date__gt=_to_datetime(now)).first()
+  if not row:
+    return None
+
+  if row.failure_status:
+    value = GeocodeFailure(row.failure_status)
+  else:
+    value = CompleteAddress(row.lat, row.lng, row.address1, row.address2, row.city, row.state, row.zip_code,
+                            row.formatted_address)
+
+  return row.expires_date.timestamp(), value
+
+
+def _set_db_entry(hashed_key, entry):
+  expires_at, value = entry
+
+  if isinstance(value, GeocodeFailure):
+    defaults = dict(((field, None) for field in CompleteAddress._fields), failure_status=value.status)
+  else:
+    defaults = dict(value._asdict(), failure_status=None)
+  defaults['expires_date'] = _to_datetime(expires_at)
+
+  GeocodedAddress.objects.update_or_create(address_key=hashed_key, defaults=defaults)
+
+
+def _to_datetime(timestamp):
+  return datetime.fromtimestamp(timestamp, timezone.utc)
+
+
+geocode_cache = GeocodeCache()
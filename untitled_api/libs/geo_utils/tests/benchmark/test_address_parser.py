@@ -0,0 +1,12 @@
+from untitled_api.libs.geo_utils.parsing import address_parser
+from untitled_api.libs.housing_utils.tests import listing_corpus
+from untitled_api.libs.python_utils.testing import benchmark_utils
+
+
+def test_parse_address_against_baseline(capsys, pytestconfig):
+  listings = listing_corpus.generate_listings(10000)
+
+  result = benchmark_utils.measure(address_parser.parse_address, [l.address for l in listings])
+
+  with capsys.disabled():
+    benchmark_utils.report(pytestconfig, 'geo_utils.address_parser.parse_address', result)
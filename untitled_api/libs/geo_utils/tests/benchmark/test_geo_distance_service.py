@@ -0,0 +1,28 @@
+import timeit
+
+import numpy
+
+from untitled_api.libs.geo_utils.services import geo_distance_service
+
+origin = (40.7217, -73.9831)
+
+
+def test_km_distances_throughput(capsys):
+  rnd = numpy.random.RandomState(0)
+  points = numpy.column_stack((rnd.uniform(40.5, 40.9, 1000000), rnd.uniform(-74.2, -73.7, 1000000)))
+  point_list = points.tolist()
+
+  assert numpy.allclose([geo_distance_service.km_distance(origin, p) for p in point_list[:1000]],
+                        geo_distance_service.km_distances(origin, points[:1000]))
+
+  scalar_seconds = timeit.timeit(lambda: [geo_distance_service.km_distance(origin, p) for p in point_list], number=1)
+  seconds = min(timeit.repeat(lambda: geo_distance_service.km_distances(origin, points), number=1, repeat=3))
+  nearest_seconds = min(timeit.repeat(lambda: geo_distance_service.k_nearest(origin, points, 50), number=1, repeat=3))
+  sorted_seconds = min(timeit.repeat(lambda: sorted(range(len(point_list)), key=[
+    geo_distance_service.km_distance(origin, p) for p in point_list].__getitem__)[:50], number=1, repeat=1))
+
+  with capsys.disabled():
+    print('\ngeo_distance_service.km_distances, 1M points: {0:.3f}s'.format(seconds))
+    print('geo_distance_service.km_distance loop, 1M points: {0:.3f}s'.format(scalar_seconds))
+    print('geo_distance_service.k_nearest, k=50 of 1M points: {0:.3f}s'.format(nearest_seconds))
+    print('km_distance loop and a full sort, k=50 of 1M points: {0:.3f}s'.format(sorted_seconds))
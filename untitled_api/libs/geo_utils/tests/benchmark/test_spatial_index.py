@@ -0,0 +1,35 @@
+import timeit
+
+import numpy
+
+from untitled_api.libs.geo_utils.indexing.spatial_index import GridIndex
+from untitled_api.libs.geo_utils.services import geo_distance_service
+
+
+def test_grid_index_radius_search_throughput(capsys):
+  rnd = numpy.random.RandomState(0)
+  points = numpy.column_stack((rnd.uniform(40.5, 40.9, 1000000), rnd.uniform(-74.2, -73.7, 1000000)))
+  origins = points[rnd.randint(0, len(points), 200)].tolist()
+
+  index = GridIndex()
+  build_seconds = timeit.timeit(lambda: [index.insert(i, lat, lng) for i, (lat, lng) in enumerate(points.tolist())],
+                                number=1)
+
+  for origin in origins[:5]:
+    distances = geo_distance_service.km_distances(origin, points)
+    assert sorted(numpy.flatnonzero(distances <= 0.5).tolist()) == sorted(m.key for m in index.within_radius(origin,
+                                                                                                            0.5))
+
+  seconds = timeit.timeit(lambda: [index.within_radius(o, 0.5) for o in origins], number=1)
+  match_count = sum(len(index.within_radius(o, 0.5)) for o in origins) / len(origins)
+  bbox_seconds = timeit.timeit(lambda: [index.within_bbox(o[0] - 0.0025, o[1] - 0.0025, o[0] + 0.0025, o[1] + 0.0025)
+                                        for o in origins], number=1)
+  scan_seconds = timeit.timeit(lambda: [geo_distance_service.km_distances(o, points) <= 0.5 for o in origins[:20]],
+                               number=1)
+
+  with capsys.disabled():
+    print('\nGridIndex, 1M points: built in {0:.1f}s'.format(build_seconds))
+    print('GridIndex.within_radius, 0.5km: {0:.3f}ms per query, {1:.0f} matches each'.format(
+      seconds / len(origins) * 1000, match_count))
+    print('GridIndex.within_bbox, 0.005 degrees square: {0:.3f}ms per query'.format(bbox_seconds / len(origins) * 1000))
+    print('geo_distance_service.km_distances full scan: {0:.3f}ms per query'.format(scan_seconds / 20 * 1000))
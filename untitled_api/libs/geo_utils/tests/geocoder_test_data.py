@@ -0,0 +1,60 @@
+import threading
+import time
+
+from pygeocoder import GeocoderError
+
+address_str = '248 E 2nd St, New York, NY 10009'
+
+address_components = [
+  {'short_name': '248', 'types': ['street_number']},
+  {'short_name': 'E 2nd St', 'types': ['route']},
+  {'short_name': 'Manhattan', 'types': ['sublocality', 'political']},
+  {'short_name': 'NY', 'types': ['administrative_area_level_1', 'political']},
+  {'short_name': '10009', 'types': ['postal_code']},
+]
+
+
+class FakeGeocoderResults(object):
+  def __init__(self, address_str):
+    self.data = [{'address_components': address_components}]
+    self.latitude = 40.7217
+    self.longitude = -73.9831
+    self.formatted_address = address_str
+
+
+class FakeGeocoder(object):
+  """
+  Stands in for pygeocoder.Geocoder, answering every address unless it's in failures, {address_str: status}. The first
+  over_limit_count calls are answered with OVER_QUERY_LIMIT, and each call takes delay seconds. Safe to share between
+  threads.
+  """
+
+  def __init__(self, failures=None, over_limit_count=0, delay=0):
+    self.failures = failures or {}
+    self.over_limit_count = over_limit_count
+    self.delay = delay
+    self.geocoded_address_strs = []
+    self.concurrent_calls = 0
+    self.max_concurrent_calls = 0
+    self._lock = threading.Lock()
+
+  def geocode(self, address_str):
+    with self._lock:
+      self.geocoded_address_strs.append(address_str)
+      self.concurrent_calls += 1
+      self.max_concurrent_calls = max(self.max_concurrent_calls, self.concurrent_calls)
+      over_limit = self.over_limit_count > 0
+      self.over_limit_count -= 1
+
+    try:
+      time.sleep(self.delay)
+
+      if over_limit:
+        raise GeocoderError(GeocoderError.G_GEO_OVER_QUERY_LIMIT)
+      if address_str in self.failures:
+        raise GeocoderError(self.failures[address_str])
+
+      return FakeGeocoderResults(address_str)
+    finally:
+      with self._lock:
+        self.concurrent_calls -= 1
@@ -0,0 +1,40 @@
+import uuid
+
+from django.core.cache.backends.locmem import LocMemCache
+from pygeocoder import GeocoderError
+import pytest
+
+from untitled_api.libs.geo_utils.models import GeocodedAddress
+from untitled_api.libs.geo_utils.services import geo_location_service
+from untitled_api.libs.geo_utils.services.geocode_cache import GeocodeCache, GeocodeFailure, get_address_key
+from untitled_api.libs.geo_utils.tests.geocoder_test_data import FakeGeocoder, address_str
+
+
+def _build_cache():
+  return GeocodeCache(max_size=10, shared_cache=LocMemCache(str(uuid.uuid4()), {}), use_db=True)
+
+
+@pytest.mark.django_db_with_migrations
+def test_db_tier_outlives_the_caches_in_front_of_it():
+  geocoder = FakeGeocoder()
+
+  expected = geo_location_service.get_geocoded_address(address_str, _geocoder=geocoder, _geocode_cache=_build_cache())
+
+  # a new process after the shared cache was flushed
+  cache = _build_cache()
+  actual = geo_location_service.get_geocoded_address(address_str, _geocoder=geocoder, _geocode_cache=cache)
+
+  assert expected == actual
+  assert 1 == GeocodedAddress.objects.count()
+  assert 1 == len(geocoder.geocoded_address_strs)
+  assert 1 == cache.stats().db_hits
+
+
+@pytest.mark.django_db_with_migrations
+def test_db_tier_keeps_failures():
+  geocoder = FakeGeocoder({address_str: GeocoderError.G_GEO_ZERO_RESULTS})
+
+  with pytest.raises(GeocoderError):
+    geo_location_service.get_geocoded_address(address_str, _geocoder=geocoder, _geocode_cache=_build_cache())
+
+  assert GeocodeFailure(GeocoderError.G_GEO_ZERO_RESULTS) == _build_cache().get(get_address_key(address_str))
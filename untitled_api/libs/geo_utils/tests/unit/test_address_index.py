@@ -0,0 +1,22 @@
+from untitled_api.libs.geo_utils.complete_address import CompleteAddress
+from untitled_api.libs.geo_utils.indexing.address_index import AddressIndex
+
+complete_address = CompleteAddress(40.7217, -73.9831, '248', None, 'New York', 'NY', '10009',
+                                   '248 E 2nd St, New York, NY 10009, USA')
+
+
+def test_address_index_finds_address_however_it_is_written():
+  index = AddressIndex([complete_address])
+
+  assert complete_address == index.get('248 East 2nd Street in East Village, New York, NY 10009')
+  assert '248 e. 2nd st., new york, ny 10009' in index
+  assert '250 E 2nd St, New York, NY 10009' not in index
+  assert index.get('250 E 2nd St, New York, NY 10009') is None
+
+
+def test_address_index_adds_geocoded_address_str():
+  index = AddressIndex()
+  index.add(complete_address, 'E 2nd St and Avenue B, New York')
+
+  assert complete_address == index.get('Avenue B & East 2nd Street, New York')
+  assert 2 == len(index)
@@ -78,3 +78,33 @@ def test_address_parser_throws_appropriate_error_for_missing_component(input_val
   with pytest.raises(ValueError):
     address_parser.parse_address(input_values)
 
+
+
+@pytest.mark.parametrize(("input_values", "expected"), [
+  ('248 E 2nd St, New York, NY 10009', '248 e 2nd st new york ny 10009'),
+  ('248 East 2nd Street in East Village, New York, NY 10009', '248 e 2nd st new york ny 10009'),
+  ('248 e. 2nd st. #4, New York, NY 10009', '248 e 2nd st #4 new york ny 10009'),
+  ('248 E 2nd Street Apt. 4, New York, NY 10009', '248 e 2nd st #4 new york ny 10009'),
+  ('248 E 2nd Street Apt 4A, New York, NY 10009', '248 e 2nd st #4a new york ny 10009'),
+  ('248 E 2nd Street Unit 12-3, New York, NY 10009', '248 e 2nd st #12-3 new york ny 10009'),
+  ('123 Main St, Apt 4A, New York, NY 10001', '123 main st #4a new york ny 10001'),
+  ('500 Broadway, Apt 4A, New York, NY 10001', '500 broadway #4a new york ny 10001'),
+  ('9 Park Ave, Suite 200, New York, NY 10001', '9 park ave #200 new york ny 10001'),
+  ('123 Main St, , New York, NY 10001', '123 main st new york ny 10001'),
+  ('Marcy Avenue and Macon Street, Brooklyn', 'macon st & marcy ave brooklyn'),
+  ('Macon st & Marcy ave, Brooklyn', 'macon st & marcy ave brooklyn'),
+  ('The Edge at 22 N 6th St, Brooklyn, NY 11249', '22 n 6th st brooklyn ny 11249'),
+  ('123 fake st', '123 fake st'),
+])
+def test_address_parser_builds_canonical_address_key(input_values, expected):
+  assert expected == address_parser.get_canonical_address_key(input_values)
+
+
+@pytest.mark.parametrize(("units"), [
+  ('Apt 4A', 'Apt 4B', 'Apt 4'),
+  ('Unit 12-3', 'Unit 12', 'Unit 123'),
+])
+def test_address_parser_keeps_units_apart_in_canonical_address_key(units):
+  keys = set(address_parser.get_canonical_address_key('248 E 2nd St {0}, New York, NY 10009'.format(unit))
+             for unit in units)
+  assert len(units) == len(keys)
@@ -0,0 +1,37 @@
+import numpy
+import pytest
+
+from untitled_api.libs.geo_utils.services import geo_distance_service
+
+origin = (40.7217, -73.9831)
+points = [(40.7217, -73.9831), (40.6942, -73.9523), (40.7580, -73.9855), (34.0522, -118.2437), (40.7306, -73.9866)]
+
+
+def test_km_distances_match_km_distance():
+  expected = [geo_distance_service.km_distance(origin, p) for p in points]
+
+  assert numpy.allclose(expected, geo_distance_service.km_distances(origin, points))
+
+
+def test_km_distance_matrix_matches_km_distance():
+  expected = [[geo_distance_service.km_distance(a, b) for b in points[:2]] for a in points]
+
+  assert numpy.allclose(expected, geo_distance_service.km_distance_matrix(points, points[:2]))
+  assert (5, 5) == geo_distance_service.km_distance_matrix(points).shape
+
+
+@pytest.mark.parametrize(("k", "expected"), [
+  (0, []),
+  (2, [0, 4]),
+  (4, [0, 4, 1, 2]),
+  (10, [0, 4, 1, 2, 3]),
+])
+def test_k_nearest_returns_nearest_first(k, expected):
+  nearest = geo_distance_service.k_nearest(origin, points, k)
+
+  assert expected == nearest.indexes.tolist()
+  assert numpy.allclose([geo_distance_service.km_distance(origin, points[i]) for i in expected], nearest.km_distances)
+
+
+def test_km_distances_accepts_no_points():
+  assert 0 == len(geo_distance_service.km_distances(origin, []))
@@ -0,0 +1,124 @@
+import uuid
+
+from django.core.cache.backends.locmem import LocMemCache
+from pygeocoder import GeocoderError
+import pytest
+
+from untitled_api.libs.geo_utils.services import geo_location_service
+from untitled_api.libs.geo_utils.services.geocode_cache import GeocodeCache, GeocodeCacheStats, GeocodeFailure, \
+  get_address_key
+from untitled_api.libs.geo_utils.signals import geocode_over_limit
+from untitled_api.libs.geo_utils.tests.geocoder_test_data import FakeGeocoder, address_str
+
+
+class FakeClock(object):
+  def __init__(self):
+    self.now = 1000.0
+
+  def __call__(self):
+    return self.now
+
+
+def _build_cache(shared_cache=None, clock=None):
+  return GeocodeCache(max_size=10, shared_cache=shared_cache or LocMemCache(str(uuid.uuid4()), {}), use_db=False,
+                      timeout=100, failure_timeout=10, _now=clock or FakeClock())
+
+
+@pytest.mark.parametrize(("input_values", "expected"), [
+  ('248 E 2nd St, New York, NY 10009', '248 e 2nd st new york ny 10009'),
+  ('  248 e 2nd st ,new york,  NY 10009 ', '248 e 2nd st new york ny 10009'),
+  ('248 East 2nd Street in East Village, New York, NY 10009', '248 e 2nd st new york ny 10009'),
+  ('123 Main St, Apt 4A, New York, NY 10001', '123 main st #4a new york ny 10001'),
+])
+def test_get_address_key_is_canonical(input_values, expected):
+  assert expected == get_address_key(input_values)
+
+
+def test_geocoded_address_is_cached():
+  geocoder = FakeGeocoder()
+  cache = _build_cache()
+
+  first = geo_location_service.get_geocoded_address(address_str, _geocoder=geocoder, _geocode_cache=cache)
+  second = geo_location_service.get_geocoded_address(address_str.lower(), _geocoder=geocoder, _geocode_cache=cache)
+
+  assert first == second
+  assert 'New York' == first.city
+  assert [address_str] == geocoder.geocoded_address_strs
+  assert GeocodeCacheStats(local_hits=1, shared_hits=0, db_hits=0, misses=1, hit_rate=0.5) == cache.stats()
+
+
+def test_same_unit_in_other_buildings_is_not_a_hit():
+  geocoder = FakeGeocoder()
+  cache = _build_cache()
+  address_strs = ['123 Main St, Apt 4A, New York, NY 10001', '500 Broadway, Apt 4A, New York, NY 10001',
+                  '123 Main St, Suite 200, New York, NY 10001', '9 Park Ave, Suite 200, New York, NY 10001']
+
+  results = [geo_location_service.get_geocoded_address(a, _geocoder=geocoder, _geocode_cache=cache)
+             for a in address_strs]
+
+  assert address_strs == [r.formatted_address for r in results]
+  assert address_strs == geocoder.geocoded_address_strs
+  assert 0 == cache.stats().local_hits
+
+
+def test_shared_cache_answers_other_processes():
+  geocoder = FakeGeocoder()
+  shared_cache = LocMemCache(str(uuid.uuid4()), {})
+  cache = _build_cache(shared_cache)
+  other_process_cache = _build_cache(shared_cache)
+
+  geo_location_service.get_geocoded_address(address_str, _geocoder=geocoder, _geocode_cache=cache)
+  geo_location_service.get_geocoded_address(address_str, _geocoder=geocoder, _geocode_cache=other_process_cache)
+  geo_location_service.get_geocoded_address(address_str, _geocoder=geocoder, _geocode_cache=other_process_cache)
+
+  assert 1 == len(geocoder.geocoded_address_strs)
+  assert (1, 1, 0) == other_process_cache.stats()[:3]
+
+
+def test_cached_address_expires():
+  geocoder = FakeGeocoder()
+  clock = FakeClock()
+  cache = _build_cache(clock=clock)
+
+  geo_location_service.get_geocoded_address(address_str, _geocoder=geocoder, _geocode_cache=cache)
+  clock.now += 101
+  geo_location_service.get_geocoded_address(address_str, _geocoder=geocoder, _geocode_cache=cache)
+
+  assert 2 == len(geocoder.geocoded_address_strs)
+
+
+def test_failure_is_cached_for_failure_timeout():
+  geocoder = FakeGeocoder({address_str: GeocoderError.G_GEO_ZERO_RESULTS})
+  clock = FakeClock()
+  cache = _build_cache(clock=clock)
+
+  for _ in range(2):
+    with pytest.raises(GeocoderError) as e:
+      geo_location_service.get_geocoded_address(address_str, _geocoder=geocoder, _geocode_cache=cache)
+    assert GeocoderError.G_GEO_ZERO_RESULTS == e.value.status
+
+  assert 1 == len(geocoder.geocoded_address_strs)
+  assert GeocodeFailure(GeocoderError.G_GEO_ZERO_RESULTS) == cache.get(get_address_key(address_str))
+
+  clock.now += 11
+  assert cache.get(get_address_key(address_str)) is None
+
+
+def test_over_limit_is_not_cached():
+  geocoder = FakeGeocoder({address_str: GeocoderError.G_GEO_OVER_QUERY_LIMIT})
+  cache = _build_cache()
+  over_limit_senders = []
+
+  def receiver(sender, **kwargs):
+    over_limit_senders.append(sender)
+
+  geocode_over_limit.connect(receiver)
+  try:
+    for _ in range(2):
+      with pytest.raises(GeocoderError):
+        geo_location_service.get_geocoded_address(address_str, _geocoder=geocoder, _geocode_cache=cache)
+  finally:
+    geocode_over_limit.disconnect(receiver)
+
+  assert 2 == len(geocoder.geocoded_address_strs)
+  assert [geo_location_service, geo_location_service] == over_limit_senders
@@ -0,0 +1,100 @@
+import uuid
+
+from django.core.cache.backends.locmem import LocMemCache
+from mock import patch
+from pygeocoder import GeocoderError
+import pytest
+
+from untitled_api.libs.geo_utils.services import geo_location_service
+from untitled_api.libs.geo_utils.services.geocode_cache import GeocodeCache
+from untitled_api.libs.geo_utils.tests.geocoder_test_data import FakeGeocoder
+
+
+class FakeRateLimiter(object):
+  def __init__(self):
+    self.acquire_count = 0
+    self.pauses = []
+
+  def acquire(self):
+    self.acquire_count += 1
+
+  def pause(self, seconds):
+    self.pauses.append(seconds)
+
+
+def _build_cache():
+  return GeocodeCache(max_size=100, shared_cache=LocMemCache(str(uuid.uuid4()), {}), use_db=False)
+
+
+def _geocode_many(address_strs, geocoder, cache=None, rate_limiter=None, max_workers=4):
+  return geo_location_service.geocode_many(address_strs, max_workers=max_workers, _geocoder=geocoder,
+                                           _geocode_cache=cache or _build_cache(),
+                                           _rate_limiter=rate_limiter or FakeRateLimiter())
+
+
+def test_geocode_many_returns_results_in_input_order():
+  geocoder = FakeGeocoder({'nowhere': GeocoderError.G_GEO_ZERO_RESULTS})
+  address_strs = ['2 Main St, Brooklyn', '1 Main St, Brooklyn', 'nowhere', '2 main st  brooklyn', '3 Main St']
+
+  results = _geocode_many(address_strs, geocoder)
+
+  assert ['2 Main St, Brooklyn', '1 Main St, Brooklyn', None, '2 Main St, Brooklyn', '3 Main St'] == \
+         [r.formatted_address if r else None for r in results]
+  # differently spelled duplicates are geocoded once
+  assert 4 == len(geocoder.geocoded_address_strs)
+
+
+def test_geocode_many_skips_cached_addresses():
+  geocoder = FakeGeocoder({'nowhere': GeocoderError.G_GEO_ZERO_RESULTS})
+  cache = _build_cache()
+  rate_limiter = FakeRateLimiter()
+
+  _geocode_many(['1 Main St', 'nowhere'], geocoder, cache)
+  geocoder.geocoded_address_strs = []
+  results = _geocode_many(['nowhere', '1 Main St', '2 Main St'], geocoder, cache, rate_limiter)
+
+  assert [None, '1 Main St', '2 Main St'] == [r.formatted_address if r else None for r in results]
+  assert ['2 Main St'] == geocoder.geocoded_address_strs
+  assert 1 == rate_limiter.acquire_count
+
+
+def test_geocode_many_runs_lookups_concurrently():
+  geocoder = FakeGeocoder(delay=0.05)
+
+  _geocode_many(['{0} Main St'.format(i) for i in range(8)], geocoder)
+
+  assert 1 < geocoder.max_concurrent_calls <= 4
+
+
+def test_geocode_many_backs_off_when_over_limit():
+  geocoder = FakeGeocoder(over_limit_count=2)
+  rate_limiter = FakeRateLimiter()
+
+  results = _geocode_many(['1 Main St'], geocoder, rate_limiter=rate_limiter)
+
+  assert '1 Main St' == results[0].formatted_address
+  assert [2.0, 4.0] == rate_limiter.pauses
+  assert 3 == rate_limiter.acquire_count
+
+
+def test_geocode_many_gives_up_when_still_over_limit():
+  geocoder = FakeGeocoder(over_limit_count=100)
+  rate_limiter = FakeRateLimiter()
+
+  with pytest.raises(GeocoderError):
+    _geocode_many(['1 Main St'], geocoder, rate_limiter=rate_limiter)
+
+  assert [2.0, 4.0, 8.0] == rate_limiter.pauses
+
+
+def test_geocoder_and_cache_can_be_patched():
+  geocoder = FakeGeocoder()
+  cache = _build_cache()
+
+  with patch.object(geo_location_service, '_geocoder', geocoder), \
+       patch.object(geo_location_service, 'geocode_cache', cache):
+    geo_location_service.get_geocoded_address('1 Main St')
+    geo_location_service.geocode_many(['2 Main St'], max_workers=1, _rate_limiter=FakeRateLimiter())
+
+  assert ['1 Main St', '2 Main St'] == geocoder.geocoded_address_strs
+  assert 2 == cache.stats().misses
@@ -0,0 +1,85 @@
+import random
+
+import pytest
+
+from untitled_api.libs.geo_utils.indexing.spatial_index import GridIndex
+from untitled_api.libs.geo_utils.services.geo_distance_service import km_distance
+
+origin = (40.7217, -73.9831)
+
+
+def _random_points(count):
+  rnd = random.Random(0)
+  return {i: (rnd.uniform(40.6, 40.85), rnd.uniform(-74.1, -73.85)) for i in range(count)}
+
+
+@pytest.mark.parametrize(("km", "cell_degrees"), [
+  (0.5, 0.01),
+  (2, 0.01),
+  (2, 0.001),
+  (50, 0.01),
+])
+def test_grid_index_radius_search_matches_full_scan(km, cell_degrees):
+  points = _random_points(2000)
+  index = GridIndex(cell_degrees)
+  for key, (lat, lng) in points.items():
+    index.insert(key, lat, lng)
+
+  expected = sorted((km_distance(origin, p), key) for key, p in points.items() if km_distance(origin, p) <= km)
+  actual = index.within_radius(origin, km)
+
+  assert [key for _, key in expected] == [m.key for m in actual]
+  assert all(abs(d - m.km_distance) < 1e-9 for (d, _), m in zip(expected, actual))
+
+
+@pytest.mark.parametrize(("high_latitude_origin", "km"), [
+  ((60, 0), 500),
+  ((75, 10), 1500),
+  ((89.5, 0), 200),
+  ((89.5, 100), 200),
+  ((-89.5, -170), 200),
+])
+def test_grid_index_radius_search_matches_full_scan_at_high_latitudes(high_latitude_origin, km):
+  rnd = random.Random(0)
+  points = {i: (rnd.uniform(50, 90), rnd.uniform(-60, 60)) for i in range(2000)}
+  points.update((i, (rnd.uniform(-90, 90), rnd.uniform(-180, 180))) for i in range(2000, 4000))
+  # across the pole from (89.5, 100) and (-89.5, -170)
+  points[-2] = (89.6, -100)
+  points[-3] = (-89.7, 10)
+  # just inside 500 km of (60, 0), but further east than 500 km along the 60th parallel reaches
+  points[-1] = (60.30, 9.0)
+  index = GridIndex(0.5)
+  for key, (lat, lng) in points.items():
+    index.insert(key, lat, lng)
+
+  expected = sorted(key for key, p in points.items() if km_distance(high_latitude_origin, p) <= km)
+
+  assert expected == sorted(m.key for m in index.within_radius(high_latitude_origin, km))
+
+
+def test_grid_index_bbox_search_matches_full_scan():
+  points = _random_points(2000)
+  index = GridIndex()
+  for key, (lat, lng) in points.items():
+    index.insert(key, lat, lng)
+
+  expected = [key for key, (lat, lng) in points.items() if 40.7 <= lat <= 40.75 and -74.0 <= lng <= -73.95]
+
+  assert sorted(expected) == sorted(index.within_bbox(40.7, -74.0, 40.75, -73.95))
+
+
+def test_grid_index_moves_and_deletes_points():
+  index = GridIndex()
+  index.insert('a', 40.7217, -73.9831)
+  index.insert('b', 40.7218, -73.9832)
+  index.insert('a', 34.0522, -118.2437)
+
+  assert ['b'] == [m.key for m in index.within_radius(origin, 1)]
+  assert ['a'] == [m.key for m in index.within_radius((34.0522, -118.2437), 1)]
+
+  index.delete('b')
+
+  assert [] == index.within_radius(origin, 1)
+  assert 'b' not in index
+  assert 1 == len(index)
+  assert 1 == len(index.cells)
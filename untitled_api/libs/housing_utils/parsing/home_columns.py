@@ -0,0 +1,67 @@
+from collections import namedtuple
+from itertools import islice
+import numpy
+from untitled_api.libs.housing_utils.parsing.home_parser import bulk_parse_home_attributes
+
+# bedroom counts are int8, so a title without one (or one that doesn't fit) gets this and is masked
+missing_bedroom_count = -1
+max_bedroom_count = numpy.iinfo(numpy.int8).max
+
+# each column is a numpy.ma.MaskedArray, masked where the title had no value
+HomeAttributeColumns = namedtuple('HomeAttributeColumns', 'bedroom_count bathroom_count sqfeet price')
+
+
+def parse_home_attribute_columns(home_strs, chunk_size=100000):
+  """
+  Parses an iterable of listing titles into HomeAttributeColumns for vectorized statistics. Titles are read and parsed
+  chunk_size at a time, so only one chunk of parsed Python objects is alive at once.
+  """
+  chunks = list(iter_home_attribute_columns(home_strs, chunk_size))
+
+  if not chunks:
+    return _to_columns([])
+
+  ret_val = HomeAttributeColumns(*(numpy.ma.concatenate(column) for column in zip(*chunks)))
+
+  # concatenate doesn't carry the fill values over
+  ret_val.bedroom_count.fill_value = missing_bedroom_count
+  for column in ret_val[1:]:
+    column.fill_value = numpy.nan
+
+  return ret_val
+
+
+def iter_home_attribute_columns(home_strs, chunk_size=100000):
+  """Yields HomeAttributeColumns per chunk_size titles, for inputs too large to hold as one set of columns."""
+  home_strs = iter(home_strs)
+
+  while True:
+    chunk = list(islice(home_strs, chunk_size))
+    if not chunk:
+      break
+
+    yield _to_columns(bulk_parse_home_attributes(chunk))
+
+
+def _to_columns(home_attributes):
+  count = len(home_attributes)
+
+  bedroom_counts = numpy.fromiter(
+    (missing_bedroom_count if a.bedroom_count is None or a.bedroom_count > max_bedroom_count else a.bedroom_count
+     for a in home_attributes),
+    dtype=numpy.int8, count=count
+  )
+
+  return HomeAttributeColumns(
+    numpy.ma.masked_array(bedroom_counts, mask=bedroom_counts == missing_bedroom_count,
+                          fill_value=missing_bedroom_count),
+    _to_float_column((a.bathroom_count for a in home_attributes), count),
+    _to_float_column((a.sqfeet for a in home_attributes), count),
+    _to_float_column((a.price for a in home_attributes), count),
+  )
+
+
+def _to_float_column(values, count):
+  column = numpy.fromiter((numpy.nan if v is None else v for v in values), dtype=numpy.float64, count=count)
+  # a parsed "$nan" is as useless as a missing price, so NaN is masked either way
+  return numpy.ma.masked_array(column, mask=numpy.isnan(column), fill_value=numpy.nan)
@@ -1,11 +1,16 @@
+from collections import namedtuple
 import re
 import logging
 
 bedroom_pattern = re.compile(r"(\d+)\s*(?:br|bed)", re.IGNORECASE)
-bathroom_pattern = re.compile(r"([\d\.]+)(.)?bath(.)*", re.IGNORECASE)
+# only the count is used, so there's no need to capture (and walk) the rest of the line after "bath"
+bathroom_pattern = re.compile(r"([\d\.]+).?bath", re.IGNORECASE)
 sqfeet_pattern = re.compile(r"(\d+)\s*ft", re.IGNORECASE)
 price_pattern = re.compile(r"\$(\S+)", re.IGNORECASE)
 
+# a namedtuple has __slots__ = (), so this is as compact as a record gets
+HomeAttributes = namedtuple('HomeAttributes', 'bedroom_count bathroom_count sqfeet price')
+
 logger = logging.getLogger(__name__)
 
 
@@ -60,6 +65,44 @@ def get_price(price_str):
   return ret_val
 
 
+def parse_home_attributes(home_str):
+  """
+  The bedroom count, bathroom count, sqfeet and price of a listing title, each as its get_ function would find it.
+  The title is lowercased once and a pattern only runs when the lowercased title has the keyword it needs.
+  """
+  lowered_home_str = home_str.lower()
+
+  if 'studio' in lowered_home_str:
+    bedroom_count = 0
+  elif 'br' in lowered_home_str or 'bed' in lowered_home_str:
+    bedroom_count = _search_home_attribute(bedroom_pattern, int, home_str, 'bedroom')
+  else:
+    bedroom_count = None
+
+  return HomeAttributes(
+    bedroom_count,
+    _search_home_attribute(bathroom_pattern, float, home_str, 'bathroom') if 'bath' in lowered_home_str else None,
+    _search_home_attribute(sqfeet_pattern, float, home_str, 'sqfeet') if 'ft' in lowered_home_str else None,
+    _search_home_attribute(price_pattern, float, home_str.replace(',', ''), 'price') if '$' in home_str else None,
+  )
+
+
+def bulk_parse_home_attributes(home_strs):
+  return [parse_home_attributes(home_str) for home_str in home_strs]
+
+
+def _search_home_attribute(pattern, cast, home_str, name):
+  ret_val = None
+  match = pattern.search(home_str)
+  if match:
+    try:
+      ret_val = cast(match.group(1))
+    except:
+      logger.warn("Error casting {0} count: {1}".format(name, home_str), exc_info=1)
+
+  return ret_val
+
+
 def get_broker_fee_from_url(url):
   ret_val = 'fee' in url.split('/')
 
@@ -0,0 +1,22 @@
+import random
+import timeit
+
+from untitled_api.libs.housing_utils.parsing import home_columns
+from untitled_api.libs.housing_utils.tests.benchmark.test_home_parser import _separate_scans, titles
+
+
+def test_home_columns_throughput(capsys):
+  rnd = random.Random(0)
+  corpus = [rnd.choice(titles) for _ in range(200000)]
+
+  seconds = timeit.timeit(lambda: home_columns.parse_home_attribute_columns(corpus, chunk_size=50000), number=1)
+  columns = home_columns.parse_home_attribute_columns(corpus, chunk_size=50000)
+  stats_seconds = timeit.timeit(lambda: (columns.price.mean(), columns.sqfeet.std(), columns.bedroom_count.max()),
+                                number=10) / 10
+
+  separate_seconds = timeit.timeit(lambda: list(zip(*[_separate_scans(t) for t in corpus])), number=1)
+
+  with capsys.disabled():
+    print('\nhome_columns.parse_home_attribute_columns: {0:,.0f} titles/s, stats over the columns in {1:.1f}ms'.format(
+      len(corpus) / seconds, stats_seconds * 1000))
+    print('home_parser get_ functions into lists: {0:,.0f} titles/s'.format(len(corpus) / separate_seconds))
@@ -0,0 +1,42 @@
+import random
+import timeit
+
+from untitled_api.libs.housing_utils.parsing import home_parser
+from untitled_api.libs.housing_utils.tests import listing_corpus
+from untitled_api.libs.python_utils.testing import benchmark_utils
+
+titles = [
+  '$5300 / 3br - 1500ft - W-O-N-D-E-R-F-U-L APT____Doorman, Roofdeck/GYM - NO FEE!!! (East Village',
+  '$2750 / 400ft - Bright studio with great closet space and city view (Midtown West)',
+  '$6400 / 4br - 1510ft - MASSIVE TRUE 4BDS/2BATHS~~48 ST~~W.D IN THE UNIT~~1ST AVE~~1500 S (Midtown East)',
+  'Multi-family Upper West Side 580 ft² $52 per ft² 1 bed 1 bath',
+  '$3,750 / 2br - Sunny 2 bed 1 bath, laundry in building (Park Slope)',
+]
+
+
+def _separate_scans(title):
+  return home_parser.HomeAttributes(home_parser.get_bedroom_count(title), home_parser.get_bathroom_count(title),
+                                    home_parser.get_sqfeet(title), home_parser.get_price(title))
+
+
+def test_home_attributes_throughput(capsys):
+  rnd = random.Random(0)
+  corpus = [rnd.choice(titles) for _ in range(20000)]
+
+  assert [_separate_scans(t) for t in corpus] == home_parser.bulk_parse_home_attributes(corpus)
+
+  separate_seconds = min(timeit.repeat(lambda: [_separate_scans(t) for t in corpus], number=1, repeat=3))
+  seconds = min(timeit.repeat(lambda: home_parser.bulk_parse_home_attributes(corpus), number=1, repeat=3))
+
+  with capsys.disabled():
+    print('\nhome_parser.bulk_parse_home_attributes: {0:,.0f} titles/s'.format(len(corpus) / seconds))
+    print('home_parser get_ functions, one scan each: {0:,.0f} titles/s'.format(len(corpus) / separate_seconds))
+
+
+def test_parse_home_attributes_against_baseline(capsys, pytestconfig):
+  listings = listing_corpus.generate_listings(10000)
+
+  result = benchmark_utils.measure(home_parser.parse_home_attributes, [l.title for l in listings])
+
+  with capsys.disabled():
+    benchmark_utils.report(pytestconfig, 'housing_utils.home_parser.parse_home_attributes', result)
@@ -0,0 +1,65 @@
+from collections import namedtuple
+import random
+
+# a synthetic listing, each field in the shape the matching parser sees when scraping
+Listing = namedtuple('Listing', 'title body address posted_at neighborhood')
+
+neighborhoods = [
+  'East Village', 'West Village', 'Midtown West', 'Midtown East', 'Upper West Side', 'Upper East Side', 'Park Slope',
+  'Williamsburg', 'Bushwick', 'Astoria', 'Harlem', 'Chelsea', 'Tribeca', 'Lower East Side', 'Bedford-Stuyvesant',
+  'Crown Heights', 'Greenpoint', 'Long Island City', 'Financial District', 'Murray Hill',
+]
+streets = ['E 2nd St', 'W 58th St', 'Broadway', 'Macon St', 'Marcy Ave', 'York Ave', '1st Ave', 'Bedford Ave',
+           'Atlantic Ave', 'Lexington Ave']
+cities = [('New York', 'NY', '100{0:02d}'), ('Brooklyn', 'NY', '112{0:02d}'), ('Jersey City', 'NJ', '073{0:02d}')]
+# keyword: value, in the {keyword: keyword_id} shape text_parser.get_canonical_name_from_keywords takes
+amenity_keywords = {
+  'doorman': 1, 'door man': 1, 'laundry': 2, 'washer dryer': 2, 'w d': 2, 'gym': 3, 'fitness center': 3,
+  'roofdeck': 4, 'roof deck': 4, 'dishwasher': 5, 'dogs': 6, 'pets': 6, 'cats': 7, 'elevator': 8, 'balcony': 9,
+  'no fee': 10,
+}
+amenity_phrases = ['a doorman', 'laundry in building', 'washer dryer in unit', 'a gym', 'a roof deck', 'a dishwasher',
+                   'no dogs', 'pets allowed', 'cats are not allowed', 'an elevator', 'a private balcony']
+contacts = [
+  'call 212-555-{0:04d}', 'text (917) 555 {0:04d}', 'email agent{0}@example.com', 'agent{0} at example dot com',
+  'agent{0}NOSPAM@example.com', 'agent{0} [at] example [dot] com', 'no contact given',
+]
+posted_at_formats = ['{0} days ago', '{0} hours on market', '2014-07-{1:02d},  {2}:15PM EDT',
+                     'Mon, {1} Jul 2014 {2:02d}:30:00 -0400']
+
+
+def generate_listings(count, seed=0):
+  """Returns count Listings built from seed, so every run parses the same corpus."""
+  rnd = random.Random(seed)
+  return [_generate_listing(rnd, i) for i in range(count)]
+
+
+def _generate_listing(rnd, i):
+  neighborhood = rnd.choice(neighborhoods)
+  bedroom_count = rnd.randint(0, 4)
+  bathroom_count = rnd.choice(['1', '1.5', '2', '2.5'])
+  sqfeet = rnd.randrange(350, 2500, 10)
+  price = rnd.randrange(1500, 9000, 25)
+
+  title = rnd.choice([
+    '${0} / {1}br - {2}ft - Sunny {1} bed {3} bath with {4} ({5})',
+    '${0:,} / {1}br - Renovated {1}BR/{3}BA, {4}, NO FEE!!! ({5})',
+    'Multi-family {5} {2} ft² ${0} {1} bed {3} bath',
+    '${0} / {2}ft - Bright studio with {4} ({5})',
+  ]).format(price, bedroom_count, sqfeet, bathroom_count, rnd.choice(amenity_phrases), neighborhood)
+
+  address_number = rnd.randint(1, 999)
+  street = rnd.choice(streets)
+  city, state, zip_code = rnd.choice(cities)
+  address = '{0} {1} in {2}, {3}, {4} {5}'.format(address_number, street, neighborhood, city, state,
+                                                  zip_code.format(rnd.randint(1, 99)))
+
+  body = (
+    'Beautiful {0} bedroom apartment at {1} {2}. The unit has {3} and {4}. '
+    'Hardwood floors, new appliances &amp; a large bathtub. <b>Available now!</b> {5} to view.'
+  ).format(bedroom_count, address_number, street, rnd.choice(amenity_phrases), rnd.choice(amenity_phrases),
+           rnd.choice(contacts).format(i % 10000))
+
+  posted_at = rnd.choice(posted_at_formats).format(rnd.randint(1, 30), rnd.randint(1, 28), rnd.randint(1, 11))
+
+  return Listing(title, body, address, posted_at, neighborhood)
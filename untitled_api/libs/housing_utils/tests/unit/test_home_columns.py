@@ -0,0 +1,34 @@
+import numpy
+from untitled_api.libs.housing_utils.parsing import home_columns
+
+titles = [
+  '$6400 / 4br - 1510ft - MASSIVE TRUE 4BDS/2BATHS~~48 ST~~W.D IN THE UNIT~~1ST AVE~~1500 S (Midtown East)',
+  '$2750 / 400ft - Bright studio with great closet space and city view (Midtown West)',
+  'no numbers here',
+  '$3,750 - 300br 1.5 bath',
+]
+
+
+def test_home_columns_are_typed_and_masked():
+  columns = home_columns.parse_home_attribute_columns(titles, chunk_size=3)
+
+  assert columns.bedroom_count.dtype == numpy.int8
+  assert columns.bedroom_count.tolist() == [4, 0, None, None]
+  assert columns.bedroom_count.filled().tolist() == [4, 0, -1, -1]
+  assert columns.bathroom_count.tolist() == [2.0, None, None, 1.5]
+  assert columns.sqfeet.tolist() == [1510.0, 400.0, None, None]
+  assert columns.price.tolist() == [6400.0, 2750.0, None, 3750.0]
+  assert columns.price.mean() == (6400.0 + 2750.0 + 3750.0) / 3
+
+
+def test_home_columns_are_parsed_in_chunks():
+  chunks = list(home_columns.iter_home_attribute_columns(iter(titles), chunk_size=3))
+
+  assert [len(chunk.price) for chunk in chunks] == [3, 1]
+
+
+def test_home_columns_handle_no_titles():
+  columns = home_columns.parse_home_attribute_columns([])
+
+  assert len(columns.price) == 0
+  assert columns.bedroom_count.dtype == numpy.int8
@@ -43,3 +43,19 @@ def test_home_parser_detects_correct_price(input_values, expected):
 ])
 def test_home_parser_detects_correct_broker_fee(input_values, expected):
   assert expected == home_parser.get_broker_fee_from_url(input_values)
+
+@pytest.mark.parametrize(("input_values", "expected"), [
+  ('$6400 / 4br - 1510ft - MASSIVE TRUE 4BDS/2BATHS~~48 ST~~W.D IN THE UNIT~~1ST AVE~~1500 S (Midtown East)',
+   home_parser.HomeAttributes(4, 2.0, 1510.0, 6400.0)),
+  ('$2750 / 400ft - Bright studio with great closet space and city view (Midtown West)',
+   home_parser.HomeAttributes(0, None, 400.0, 2750.0)),
+  ('$2750/400ft 1br', home_parser.HomeAttributes(1, None, 400.0, None)),
+  ('$3,750 - 1,200ft 2 bed 1.5 bath', home_parser.HomeAttributes(2, 1.5, 200.0, 3750.0)),
+  ('', home_parser.HomeAttributes(None, None, None, None)),
+])
+def test_home_parser_parses_all_attributes(input_values, expected):
+  assert expected == home_parser.parse_home_attributes(input_values)
+
+def test_home_parser_bulk_parses_attributes():
+  assert [home_parser.HomeAttributes(0, None, None, None), home_parser.HomeAttributes(1, None, None, None)] == \
+         home_parser.bulk_parse_home_attributes(['studio', '1br'])
@@ -0,0 +1,65 @@
+from collections import OrderedDict, namedtuple
+import threading
+
+CacheStats = namedtuple('CacheStats', 'hits misses size max_size')
+
+_missing = object()
+
+
+class LRUCache(object):
+  """
+  A dict bounded to max_size entries, dropping the least recently used one when it's full. Counts hits and misses
+  so callers can report how well it's working. Safe to share between threads.
+  """
+
+  def __init__(self, max_size=1024):
+    self.max_size = max_size
+    self.hits = 0
+    self.misses = 0
+    self._entries = OrderedDict()
+    self._lock = threading.Lock()
+
+  def get(self, key, default=None):
+    with self._lock:
+      value = self._entries.get(key, _missing)
+
+      if value is _missing:
+        self.misses += 1
+        return default
+
+      self.hits += 1
+      self._entries.move_to_end(key)
+      return value
+
+  def set(self, key, value):
+    with self._lock:
+      self._entries[key] = value
+      self._entries.move_to_end(key)
+
+      if len(self._entries) > self.max_size:
+        self._entries.popitem(last=False)
+
+  def get_or_set(self, key, get_value):
+    """Returns the cached value for key, calling get_value() and caching what it returns on a miss."""
+    value = self.get(key, _missing)
+
+    if value is _missing:
+      value = get_value()
+      self.set(key, value)
+
+    return value
+
+  def clear(self):
+    with self._lock:
+      self._entries.clear()
+      self.hits = 0
+      self.misses = 0
+
+  def stats(self):
+    return CacheStats(self.hits, self.misses, len(self._entries), self.max_size)
+
+  def __len__(self):
+    return len(self._entries)
+
+  def __contains__(self, key):
+    return key in self._entries
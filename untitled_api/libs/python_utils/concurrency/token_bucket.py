@@ -0,0 +1,41 @@
+import threading
+import time
+
+
+class TokenBucket(object):
+  """
+  Rate limiter handing out rate tokens a second, and up to capacity at once after a quiet spell. acquire() blocks until
+  a token is free, pause() holds every caller back for a while, like when a provider says we're over its limit. Safe
+  to share between threads.
+  """
+
+  def __init__(self, rate, capacity=1, _clock=time.monotonic, _sleep=time.sleep):
+    self.rate = rate
+    self.capacity = capacity
+    self.tokens = capacity
+    self._clock = _clock
+    self._sleep = _sleep
+    self._updated_at = _clock()
+    self._lock = threading.Lock()
+
+  def acquire(self):
+    with self._lock:
+      now = self._clock()
+
+      # _updated_at is in the future while paused, and nothing accrues until then
+      if now > self._updated_at:
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+      # the token is taken now and waited for outside the lock, a negative balance is the callers still waiting
+      self.tokens -= 1
+      wait = max(0, self._updated_at - now) + max(0, -self.tokens) / self.rate
+
+    if wait > 0:
+      self._sleep(wait)
+
+  def pause(self, seconds):
+    with self._lock:
+      self._updated_at = max(self._updated_at, self._clock() + seconds)
+      # nothing is left over from before the pause, so callers don't all burst out at the end of it
+      self.tokens = min(self.tokens, 0)
@@ -0,0 +1,115 @@
+from collections import namedtuple
+import json
+import os
+import time
+import tracemalloc
+
+# committed alongside this module, rewrite it with --update-benchmark-baseline after an intended change in speed
+baseline_path = os.path.join(os.path.dirname(__file__), 'parser_benchmark_baseline.json')
+# how much slower or bigger than the baseline a result can get before it's reported as a regression, timings from
+# one run to the next on a busy machine differ by a good part of that
+regression_tolerance = 0.5
+
+BenchmarkResult = namedtuple('BenchmarkResult', 'docs_per_second p50_ms p99_ms peak_kb_per_10k_docs')
+
+
+def measure(parse, docs, repeat=3):
+  """
+  Runs parse over each of docs and returns a BenchmarkResult. Throughput is the best of repeat runs, latencies are per
+  doc, and peak memory is what tracemalloc sees allocated while the parse results are kept, scaled to 10k docs.
+  """
+  timer = time.perf_counter
+  best_seconds = None
+  latencies = []
+
+  for _ in range(repeat):
+    run_latencies = []
+    run_start = timer()
+
+    for doc in docs:
+      start = timer()
+      parse(doc)
+      run_latencies.append(timer() - start)
+
+    seconds = timer() - run_start
+    if best_seconds is None or seconds < best_seconds:
+      best_seconds, latencies = seconds, run_latencies
+
+  latencies.sort()
+
+  tracemalloc.start()
+  try:
+    start_size = tracemalloc.get_traced_memory()[0]
+    results = [parse(doc) for doc in docs]
+    peak_size = tracemalloc.get_traced_memory()[1] - start_size
+  finally:
+    tracemalloc.stop()
+  del results
+
+  return BenchmarkResult(
+    docs_per_second=round(len(docs) / best_seconds),
+    p50_ms=round(_percentile(latencies, 50) * 1000, 4),
+    p99_ms=round(_percentile(latencies, 99) * 1000, 4),
+    peak_kb_per_10k_docs=round(peak_size / 1024 * 10000 / len(docs), 1),
+  )
+
+
+def _percentile(sorted_values, percent):
+  return sorted_values[min(len(sorted_values) - 1, len(sorted_values) * percent // 100)]
+
+
+def load_baseline(path=baseline_path):
+  try:
+    with open(path) as baseline_file:
+      return {name: BenchmarkResult(**result) for name, result in json.load(baseline_file).items()}
+  except FileNotFoundError:
+    return {}
+
+
+def save_baseline(results, path=baseline_path):
+  with open(path, 'w') as baseline_file:
+    json.dump({name: result._asdict() for name, result in results.items()}, baseline_file, indent=2, sort_keys=True)
+    baseline_file.write('\n')
+
+
+def get_regressions(result, baseline_result, tolerance=regression_tolerance):
+  """Returns a message per measurement of result that's worse than baseline_result by more than tolerance."""
+  ret_val = []
+
+  if result.docs_per_second < baseline_result.docs_per_second * (1 - tolerance):
+    ret_val.append('docs_per_second {0:,} < baseline {1:,}'.format(result.docs_per_second,
+                                                                    baseline_result.docs_per_second))
+
+  for field in ('p50_ms', 'p99_ms', 'peak_kb_per_10k_docs'):
+    value, baseline_value = getattr(result, field), getattr(baseline_result, field)
+    if value > baseline_value * (1 + tolerance):
+      ret_val.append('{0} {1} > baseline {2}'.format(field, value, baseline_value))
+
+  return ret_val
+
+
+def report(config, name, result, path=baseline_path):
+  """
+  Prints result next to its baseline and returns the regressions. With --update-benchmark-baseline the result
+  replaces the baseline instead. Timing depends on the machine, so regressions are reported rather than failed.
+  """
+  baseline = load_baseline(path)
+  baseline_result = baseline.get(name)
+
+  print('\n{0}: {1.docs_per_second:,} docs/s, p50 {1.p50_ms}ms, p99 {1.p99_ms}ms, {1.peak_kb_per_10k_docs}KB peak '
+        'per 10k docs'.format(name, result))
+
+  if getattr(config.option, 'update_benchmark_baseline', False):
+    baseline[name] = result
+    save_baseline(baseline, path)
+    return []
+
+  if baseline_result is None:
+    print('  no baseline yet, run with --update-benchmark-baseline to record one')
+    return []
+
+  ret_val = get_regressions(result, baseline_result)
+  for regression in ret_val:
+    print('  REGRESSION: ' + regression)
+
+  return ret_val
@@ -0,0 +1,36 @@
+import os
+import tempfile
+
+import pytest
+
+from untitled_api.libs.python_utils.testing.benchmark_utils import BenchmarkResult, get_regressions, load_baseline, \
+  measure, save_baseline
+
+baseline_result = BenchmarkResult(docs_per_second=1000, p50_ms=1.0, p99_ms=2.0, peak_kb_per_10k_docs=100.0)
+
+
+def test_measure_reports_every_measurement():
+  result = measure(lambda doc: doc.split(), ['a b c'] * 100, repeat=1)
+
+  assert result.docs_per_second > 0
+  assert 0 <= result.p50_ms <= result.p99_ms
+  assert result.peak_kb_per_10k_docs > 0
+
+
+@pytest.mark.parametrize(("result", "expected_count"), [
+  (baseline_result, 0),
+  (BenchmarkResult(docs_per_second=900, p50_ms=1.1, p99_ms=2.2, peak_kb_per_10k_docs=110.0), 0),
+  (BenchmarkResult(docs_per_second=400, p50_ms=1.0, p99_ms=2.0, peak_kb_per_10k_docs=100.0), 1),
+  (BenchmarkResult(docs_per_second=400, p50_ms=2.0, p99_ms=4.0, peak_kb_per_10k_docs=200.0), 4),
+])
+def test_get_regressions_allows_tolerance(result, expected_count):
+  assert expected_count == len(get_regressions(result, baseline_result))
+
+
+def test_baseline_round_trips():
+  path = os.path.join(tempfile.mkdtemp(), 'baseline.json')
+
+  assert load_baseline(path) == {}
+
+  save_baseline({'parser': baseline_result}, path)
+  assert load_baseline(path) == {'parser': baseline_result}
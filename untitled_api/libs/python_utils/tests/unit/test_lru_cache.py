@@ -0,0 +1,33 @@
+from untitled_api.libs.python_utils.collections.lru_cache import CacheStats, LRUCache
+
+
+def test_lru_cache_drops_least_recently_used():
+  cache = LRUCache(max_size=2)
+  cache.set('a', 1)
+  cache.set('b', 2)
+  cache.get('a')
+  cache.set('c', 3)
+
+  assert 'a' in cache
+  assert 'b' not in cache
+  assert 'c' in cache
+  assert len(cache) == 2
+
+
+def test_lru_cache_counts_hits_and_misses():
+  cache = LRUCache(max_size=2)
+  calls = []
+
+  def get_value():
+    calls.append(1)
+    return None
+
+  assert cache.get_or_set('a', get_value) is None
+  assert cache.get_or_set('a', get_value) is None
+  assert cache.get('b', 'default') == 'default'
+
+  assert len(calls) == 1
+  assert cache.stats() == CacheStats(hits=1, misses=2, size=1, max_size=2)
+
+  cache.clear()
+  assert cache.stats() == CacheStats(hits=0, misses=0, size=0, max_size=2)
@@ -0,0 +1,50 @@
+from untitled_api.libs.python_utils.concurrency.token_bucket import TokenBucket
+
+
+class FakeClock(object):
+  """Clock and sleep for a TokenBucket, where sleeping just moves the clock."""
+
+  def __init__(self):
+    self.now = 100.0
+    self.sleeps = []
+
+  def __call__(self):
+    return self.now
+
+  def sleep(self, seconds):
+    self.sleeps.append(seconds)
+    self.now += seconds
+
+
+def test_token_bucket_spaces_out_acquires():
+  clock = FakeClock()
+  bucket = TokenBucket(rate=4, _clock=clock, _sleep=clock.sleep)
+
+  for _ in range(5):
+    bucket.acquire()
+
+  assert 101.0 == clock.now
+
+
+def test_token_bucket_allows_bursts_up_to_capacity():
+  clock = FakeClock()
+  bucket = TokenBucket(rate=2, capacity=3, _clock=clock, _sleep=clock.sleep)
+
+  for _ in range(3):
+    bucket.acquire()
+  assert [] == clock.sleeps
+
+  clock.now += 10
+  for _ in range(4):
+    bucket.acquire()
+  assert [0.5] == clock.sleeps
+
+
+def test_token_bucket_pause_holds_back_acquires():
+  clock = FakeClock()
+  bucket = TokenBucket(rate=10, capacity=5, _clock=clock, _sleep=clock.sleep)
+
+  bucket.pause(3)
+  bucket.acquire()
+
+  assert 103.1 == round(clock.now, 6)
@@ -1,44 +1,75 @@
 import html.entities
 import re
 
+entity_pattern = re.compile(r'&#?\w+;')
+# r'((?:\s\S){3,})\s' spelled so that it starts with \s, which lets the regex engine skip ahead to whitespace
+spaced_out_pattern = re.compile(r'\s\S(?:\s\S){2,}\s')
+from_char_code_pattern = re.compile(r'fromCharCode\((.+)\)')
+
+ascii_non_alpha_numeric_bytes = bytes(b for b in range(128) if not chr(b).isalnum())
+
+
+class _AlphaNumericTable(dict):
+  """str.translate table that deletes non alphanumeric characters, filled in as characters are first seen."""
+
+  def __missing__(self, code_point):
+    ret_val = code_point if chr(code_point).isalnum() else None
+    self[code_point] = ret_val
+    return ret_val
+
+alpha_numeric_table = _AlphaNumericTable()
+
 
 def unescape(text):
-  def fixup(m):
-    text = m.group(0)
-    if text[:2] == '&#':
-      # character reference
-      try:
-        if text[:3] == '&#x':
-          return chr(int(text[3:-1], 16))
-        else:
-          return chr(int(text[2:-1]))
-      except ValueError:
-        pass
-    else:
-      # named entity
-      try:
-        text = chr(html.entities.name2codepoint[text[1:-1]])
-      except KeyError:
-        pass
-    return text # leave as is
-
-  return re.sub(r'&#?\w+;', fixup, text)
+  if '&' not in text:
+    return text
+
+  return entity_pattern.sub(_unescape_entity, text)
+
+
+def _unescape_entity(m):
+  text = m.group(0)
+  if text[:2] == '&#':
+    # character reference
+    try:
+      if text[:3] == '&#x':
+        return chr(int(text[3:-1], 16))
+      else:
+        return chr(int(text[2:-1]))
+    except ValueError:
+      pass
+  else:
+    # named entity
+    try:
+      text = chr(html.entities.name2codepoint[text[1:-1]])
+    except KeyError:
+      pass
+  return text # leave as is
 
 
 def despacify(text):
-  def fixup(m):
-    text = m.group(0)
-    return ' ' + ''.join(text.split()) + ' '
+  return spaced_out_pattern.sub(_despacify_match, text)
 
-  return re.sub(r'((?:\s\S){3,})\s', fixup, text)
+
+def _despacify_match(m):
+  text = m.group(0)
+  return ' ' + ''.join(text.split()) + ' '
 
 # this only works on really naive js obfuscations; tacks decoded emails on the end.
 def decodeJs(text):
-  def fixup(m):
-    return ''.join(chr(int(point)) for point in m.group(1).split(','))
+  if 'fromCharCode' not in text:
+    return text
+
+  return from_char_code_pattern.sub(_decode_char_codes, text)
+
 
-  return re.sub(r'fromCharCode\((.+)\)', fixup, text)
+def _decode_char_codes(m):
+  return ''.join(chr(int(point)) for point in m.group(1).split(','))
 
 
 def only_alpha_numeric(content):
-  return ''.join(x for x in content if x.isalnum())
+  try:
+    # most content is ascii, and bytes.translate can delete characters without a table lookup per character
+    return content.encode('ascii').translate(None, ascii_non_alpha_numeric_bytes).decode('ascii')
+  except UnicodeEncodeError:
+    return content.translate(alpha_numeric_table)
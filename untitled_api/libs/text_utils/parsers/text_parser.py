@@ -1,20 +1,30 @@
 import logging
 from untitled_api.libs.text_utils.CanonicalNameResult import CanonicalNameResult
-from untitled_api.libs.text_utils.formatting.text_formatter import only_alpha_numeric
+from untitled_api.libs.text_utils.search.keyword_search import KeywordMatcher, get_keyword_matcher
 
 logger = logging.getLogger(__name__)
 
-def get_canonical_name_from_keywords(content, keywords):
-  ret_val = []
+def get_canonical_name_from_keywords(content, keywords, cache=None, keywords_version=None,
+                                     _get_keyword_matcher=get_keyword_matcher):
+  """
+  keywords is a {keyword: keyword_id} dict, or a KeywordMatcher already built from one. A dict is compiled once and
+  reused while it's the same object, pass a new keywords_version after changing it in place. Pass an LRUCache as cache
+  to reuse results for content that only differs in case and spacing.
+  """
+  if not isinstance(keywords, KeywordMatcher):
+    keywords = _get_keyword_matcher(keywords, keywords_version)
 
-  content_alnum = only_alpha_numeric(content).lower()
-  content_words = [only_alpha_numeric(x) for x in content.lower().split()]
+  if cache is None:
+    ret_val = _get_canonical_names(content, keywords)
+  else:
+    # matching lowercases and splits on whitespace anyway, so this doesn't change the result
+    normalized_content = ' '.join(content.lower().split())
+    ret_val = list(cache.get_or_set(
+      (keywords.version, normalized_content), lambda: tuple(_get_canonical_names(normalized_content, keywords))
+    ))
 
-  for k, v in list(keywords.items()):
-    if " " in k:
-      if only_alpha_numeric(k).lower() in content_alnum:
-        ret_val.append(CanonicalNameResult(v, True))
-    elif only_alpha_numeric(k).lower() in content_words:
-      ret_val.append(CanonicalNameResult(v, True))
+  return ret_val
 
-  return list(set(ret_val))
+
+def _get_canonical_names(content, keyword_matcher):
+  return [CanonicalNameResult(v, is_available) for v, is_available in keyword_matcher.match(content).items()]
@@ -1,16 +1,137 @@
+from collections import Counter, OrderedDict, defaultdict, namedtuple
 from difflib import SequenceMatcher
-import operator
+import heapq
+import itertools
 
+FuzzyMatch = namedtuple('FuzzyMatch', 'word score')
 
-def get_closest_word(target, sources):
-  matcher = SequenceMatcher(a=target)
 
-  seqs = {}
+def get_closest_word(target, sources, cache=None, vocabulary_version=None):
+  """
+  Pass an LRUCache as cache to reuse answers, along with a vocabulary_version that identifies sources. Answers are
+  cached per vocabulary_version, so it has to change whenever sources do.
+  """
+  if cache is None:
+    return _get_closest_word(len(target), sources)
 
-  for s in sources:
-    matcher.set_seq2(s)
-    seqs[s] = matcher.real_quick_ratio()
+  if vocabulary_version is None: raise ValueError('vocabulary_version is required with a cache')
+
+  # only the target's length affects the answer, so that's the whole key
+  return cache.get_or_set((vocabulary_version, len(target)), lambda: _get_closest_word(len(target), sources))
+
+
+def _get_closest_word(target_length, sources):
+  # real_quick_ratio only looks at the lengths, so there's no need for a SequenceMatcher per source or a full sort
+  return max(sources, key=lambda s: _length_ratio(target_length, len(s)))
+
+
+def _length_ratio(length_a, length_b):
+  # SequenceMatcher.real_quick_ratio without the matcher
+  return _ratio(min(length_a, length_b), length_a + length_b)
+
+
+def _grams(word, n=3):
+  padded_word = ' ' + word + ' '
+  return set(padded_word[i:i + n] for i in range(max(1, len(padded_word) - n + 1)))
+
+
+class FuzzyIndex(object):
+  """
+  Finds the sources closest to a target by SequenceMatcher(a=source, b=target).ratio(), the same score as
+  difflib.get_close_matches. Built once from the sources. Candidates are the candidate_count * k sources sharing the
+  most trigrams with the target, and the ratio is only computed for candidates that the cheaper real_quick_ratio and
+  quick_ratio bounds can't rule out. Pass an LRUCache as cache to reuse the answer for repeated targets.
+  """
+  _versions = itertools.count(1)
+
+  def __init__(self, sources, candidate_count=50, cache=None):
+    self.words = list(OrderedDict.fromkeys(sources))
+    self.candidate_count = candidate_count
+    self.cache = cache
+    # identifies this vocabulary in a cache shared with other indexes
+    self.version = next(FuzzyIndex._versions)
+
+    self.char_counts = [Counter(word) for word in self.words]
+    self.ids_by_length = defaultdict(list)
+    self.ids_by_gram = defaultdict(list)
+
+    for word_id, word in enumerate(self.words):
+      self.ids_by_length[len(word)].append(word_id)
+      for gram in _grams(word):
+        self.ids_by_gram[gram].append(word_id)
+
+  def get_closest_words(self, target, k=1, exhaustive=False):
+    """
+    Returns up to k FuzzyMatch, best first, ties going to the source that came first. A source sharing few trigrams
+    with the target can be missed. Pass exhaustive to check every source that the bounds don't rule out, which is
+    exact but much slower. That also happens when fewer than k candidates share a trigram.
+    """
+    if self.cache is None:
+      return self._get_closest_words(target, k, exhaustive)
+
+    return list(self.cache.get_or_set(
+      (self.version, target, k, exhaustive), lambda: tuple(self._get_closest_words(target, k, exhaustive))
+    ))
+
+  def _get_closest_words(self, target, k, exhaustive):
+    matcher = SequenceMatcher(b=target)
+    target_length = len(target)
+    target_char_counts = Counter(target)
+
+    # min-heap of the best k so far as ((score, -word_id), word_id), so best[0] is the one to beat
+    best = []
+    checked_ids = set()
+
+    def consider(word_id, upper_bound):
+      key = (upper_bound, -word_id)
+      if len(best) == k and key <= best[0][0]:
+        return
+
+      char_counts = self.char_counts[word_id]
+      matches = sum(min(count, char_counts[char]) for char, count in target_char_counts.items())
+      key = (_ratio(matches, target_length + len(self.words[word_id])), -word_id)
+      if len(best) == k and key <= best[0][0]:
+        return
+
+      # SequenceMatcher caches what it learns about b, so like get_close_matches the target is b
+      matcher.set_seq1(self.words[word_id])
+      key = (matcher.ratio(), -word_id)
+      if len(best) < k:
+        heapq.heappush(best, (key, word_id))
+      elif key > best[0][0]:
+        heapq.heapreplace(best, (key, word_id))
+
+    # sources sharing the most trigrams are likely the best matches
+    gram_hits = Counter()
+    for gram in _grams(target):
+      gram_hits.update(self.ids_by_gram.get(gram, ()))
+
+    for word_id, _ in gram_hits.most_common(self.candidate_count * k):
+      consider(word_id, _length_ratio(target_length, len(self.words[word_id])))
+      checked_ids.add(word_id)
+
+    if not exhaustive and len(best) == k:
+      return _to_fuzzy_matches(self.words, best)
+
+    # every other source, in order of the best score its length allows
+    length_bounds = sorted(
+      ((_length_ratio(target_length, length), length) for length in self.ids_by_length), reverse=True
+    )
+    for length_bound, length in length_bounds:
+      if len(best) == k and length_bound < best[0][0][0]:
+        break
+
+      for word_id in self.ids_by_length[length]:
+        if word_id not in checked_ids:
+          consider(word_id, length_bound)
+
+    return _to_fuzzy_matches(self.words, best)
+
+
+def _to_fuzzy_matches(words, best):
+  return [FuzzyMatch(words[word_id], key[0]) for key, word_id in sorted(best, reverse=True)]
+
+
+def _ratio(matches, total_length):
+  return 2.0 * matches / total_length if total_length else 1.0
 
-  # http://stackoverflow.com/a/613218/173957
-  sorted_seqs = sorted(iter(seqs.items()), key=operator.itemgetter(1), reverse=True)
-  return sorted_seqs[0][0]
@@ -0,0 +1,193 @@
+from bisect import bisect_right
+from collections import deque
+import itertools
+from untitled_api.libs.python_utils.collections.lru_cache import LRUCache
+from untitled_api.libs.text_utils.formatting.text_formatter import only_alpha_numeric
+
+# "no dogs", "without a doorman": negates the next few words of the clause
+pre_negations = frozenset(['no', 'not', 'non', 'without', 'never', 'nor'])
+pre_negation_window = 3
+# "dogs are not allowed", "heat isn't included": negates the few words of the clause before it
+post_negations = frozenset(['not', 'isnt', 'arent', 'dont', 'doesnt', 'cant', 'cannot', 'wont'])
+post_negation_window = 2
+# a negation doesn't reach past the end of its clause, or past a word that is only punctuation like "-" or "|"
+clause_end_chars = frozenset('.,;:!?)')
+
+
+class KeywordMatcher(object):
+  """
+  Matches a {keyword: value} dict against content in one pass over the content, however many keywords there are.
+  Keywords containing a space match anywhere in the content once both are stripped to lowercase alphanumerics,
+  other keywords have to equal a whole word of the content. Build it once per keyword dict, see get_keyword_matcher.
+  """
+  _versions = itertools.count(1)
+
+  def __init__(self, keywords):
+    # identifies this keyword set in caches of match results
+    self.version = next(KeywordMatcher._versions)
+    self.word_values = {}
+    self.has_phrases = False
+    # Aho-Corasick automaton over the stripped phrases: per state its transitions, failure state and the
+    # (value, phrase length) pairs it matches
+    self.transitions = [{}]
+    self.fail_states = [0]
+    self.state_values = [set()]
+
+    for keyword, value in keywords.items():
+      if " " in keyword:
+        self._add_phrase(only_alpha_numeric(keyword).lower(), value)
+      else:
+        self.word_values.setdefault(only_alpha_numeric(keyword).lower(), set()).add(value)
+
+    self._link_fail_states()
+
+  def _add_phrase(self, phrase, value):
+    self.has_phrases = True
+    state = 0
+
+    for char in phrase:
+      next_state = self.transitions[state].get(char)
+
+      if next_state is None:
+        next_state = len(self.transitions)
+        self.transitions.append({})
+        self.fail_states.append(0)
+        self.state_values.append(set())
+        self.transitions[state][char] = next_state
+
+      state = next_state
+
+    self.state_values[state].add((value, len(phrase)))
+
+  def _link_fail_states(self):
+    # breadth first, so a state's failure state is always linked before the state itself
+    queue = deque(self.transitions[0].values())
+
+    while queue:
+      state = queue.popleft()
+
+      for char, next_state in self.transitions[state].items():
+        fail_state = self.fail_states[state]
+        while fail_state and char not in self.transitions[fail_state]:
+          fail_state = self.fail_states[fail_state]
+
+        self.fail_states[next_state] = self.transitions[fail_state].get(char, 0)
+        self.state_values[next_state] |= self.state_values[self.fail_states[next_state]]
+        queue.append(next_state)
+
+  def _get_phrase_ends(self, token, state, offset):
+    """Yields (value, phrase length, offset past its last char) per phrase ending in the token, fed from state."""
+    for end_offset, char in enumerate(token, offset + 1):
+      while state and char not in self.transitions[state]:
+        state = self.fail_states[state]
+
+      state = self.transitions[state].get(char, 0)
+      for value, length in self.state_values[state]:
+        # the empty phrase is in every content anyway
+        if length:
+          yield value, length, end_offset
+
+  def match(self, content):
+    """
+    Returns {value: is_available} for the keywords in the content. A mention is unavailable when a negation covers
+    any of its words ("no dogs", "dogs are not allowed"), and one available mention is enough for the value to be
+    available. A negation that's part of a matched phrase, like the "no" of "no fee", doesn't negate anything.
+    """
+    # (value, first word index, last word index) per mention
+    mentions = []
+    # (cue word index, first word index, last word index) per negation window
+    negations = []
+    clause_start = 0
+    clause_negations_start = 0
+    # the word indexes of matched phrases, and the offset of each word in the content stripped like the phrases
+    phrase_words = set()
+    word_offsets = []
+    offset = 0
+
+    transitions, fail_states, state_values = self.transitions, self.fail_states, self.state_values
+    state = 0
+
+    for i, word in enumerate(content.lower().split()):
+      token = only_alpha_numeric(word)
+
+      if token in post_negations:
+        negations.append((i, max(clause_start, i - post_negation_window), i - 1))
+      if token in pre_negations:
+        negations.append((i, i + 1, i + pre_negation_window))
+
+      values = self.word_values.get(token)
+      if values:
+        mentions.extend((value, i, i) for value in values)
+
+      if self.has_phrases:
+        word_offsets.append(offset)
+
+        token_state = state
+        phrase_ended = False
+
+        for char in token:
+          while state and char not in transitions[state]:
+            state = fail_states[state]
+
+          state = transitions[state].get(char, 0)
+          if state_values[state]:
+            phrase_ended = True
+
+        # phrases are rare, so where they start is only worked out for the words they end in
+        if phrase_ended:
+          for value, length, end_offset in self._get_phrase_ends(token, token_state, offset):
+            # the phrase starts in the last word starting at or before its first char
+            start = bisect_right(word_offsets, end_offset - length) - 1
+            mentions.append((value, start, i))
+            phrase_words.update(range(start, i + 1))
+
+        offset += len(token)
+
+      if not token or word[-1] in clause_end_chars:
+        # a negation doesn't reach into the next clause
+        for j in range(clause_negations_start, len(negations)):
+          cue, first, last = negations[j]
+          negations[j] = (cue, first, min(last, i))
+
+        clause_start = i + 1
+        clause_negations_start = len(negations)
+
+    ret_val = {}
+
+    if self.has_phrases:
+      # an empty phrase, like a keyword of only spaces, is in every content
+      ret_val.update((value, True) for value, length in state_values[0])
+
+    if not mentions:
+      return ret_val
+
+    negated = [False] * (i + 1)
+    for cue, first, last in negations:
+      if cue not in phrase_words:
+        for j in range(first, min(last, i) + 1):
+          negated[j] = True
+
+    for value, start, end in mentions:
+      ret_val[value] = ret_val.get(value, False) or not any(negated[start:end + 1])
+
+    return ret_val
+
+
+# (id of the keyword dict, keywords_version): (keyword dict, KeywordMatcher)
+_keyword_matchers = LRUCache(32)
+
+
+def get_keyword_matcher(keywords, keywords_version=None):
+  """
+  Returns the KeywordMatcher built for this keyword dict, so a keyword table is compiled once however often it's
+  matched. Dicts are told apart by identity, not contents, pass a new keywords_version after changing one in place.
+  """
+  key = (id(keywords), keywords_version)
+  entry = _keyword_matchers.get(key)
+
+  if entry is None:
+    # the entry holds on to the dict, so no other dict can get its id while it's cached
+    entry = (keywords, KeywordMatcher(keywords))
+    _keyword_matchers.set(key, entry)
+
+  return entry[1]
@@ -0,0 +1,66 @@
+import difflib
+import random
+import timeit
+
+from untitled_api.libs.housing_utils.tests import listing_corpus
+from untitled_api.libs.python_utils.testing import benchmark_utils
+from untitled_api.libs.text_utils.search.fuzzy_search import FuzzyIndex, get_closest_word
+
+syllables = ['ar', 'ber', 'co', 'dal', 'en', 'fi', 'gra', 'ho', 'is', 'jun', 'ka', 'lo', 'man', 'ne', 'or', 'pa',
+             'qui', 'ra', 'ste', 'tor', 'un', 'va', 'wil', 'xe', 'yo', 'zin']
+
+
+def _vocabulary(rnd, size):
+  words = set()
+  while len(words) < size:
+    words.add(''.join(rnd.choice(syllables) for _ in range(rnd.randint(1, 5))))
+  return sorted(words)
+
+
+def _typo(rnd, word):
+  i = rnd.randrange(len(word))
+  return word[:i] + rnd.choice('aeiourst') + word[i + 1:]
+
+
+def test_fuzzy_index_throughput(capsys):
+  rnd = random.Random(0)
+  vocabulary = _vocabulary(rnd, 50000)
+  targets = [_typo(rnd, rnd.choice(vocabulary)) for _ in range(200)]
+
+  build_seconds = timeit.timeit(lambda: FuzzyIndex(vocabulary), number=1)
+  index = FuzzyIndex(vocabulary)
+
+  for target in targets[:3]:
+    expected = max(difflib.SequenceMatcher(a=w, b=target).ratio() for w in vocabulary)
+    assert expected == index.get_closest_words(target, exhaustive=True)[0].score
+
+  # how often the trigram candidates contain the true best match
+  same_best_count = sum(
+    index.get_closest_words(t)[0].score == index.get_closest_words(t, exhaustive=True)[0].score for t in targets[:20]
+  )
+
+  seconds = timeit.timeit(lambda: [index.get_closest_words(t, k=5) for t in targets], number=1)
+  exhaustive_seconds = timeit.timeit(lambda: [index.get_closest_words(t, k=5, exhaustive=True) for t in targets[:5]],
+                                     number=1)
+  brute_seconds = timeit.timeit(lambda: [difflib.get_close_matches(t, vocabulary, n=5, cutoff=0)
+                                         for t in targets[:5]], number=1)
+  closest_word_seconds = timeit.timeit(lambda: [get_closest_word(t, vocabulary) for t in targets[:20]], number=1)
+
+  with capsys.disabled():
+    print('\nFuzzyIndex, 50k words: built in {0:.2f}s, top 5 at {1:,.0f} queries/s'.format(
+      build_seconds, len(targets) / seconds))
+    print('FuzzyIndex exhaustive, 50k words: {0:,.1f} queries/s, default finds the same best {1}/20 times'.format(
+      5 / exhaustive_seconds, same_best_count))
+    print('difflib.get_close_matches, 50k words: {0:,.1f} queries/s'.format(5 / brute_seconds))
+    print('get_closest_word, 50k words: {0:,.0f} queries/s'.format(20 / closest_word_seconds))
+
+
+def test_fuzzy_index_against_baseline(capsys, pytestconfig):
+  rnd = random.Random(0)
+  index = FuzzyIndex(listing_corpus.neighborhoods)
+  targets = [_typo(rnd, l.neighborhood.lower()) for l in listing_corpus.generate_listings(10000)]
+
+  result = benchmark_utils.measure(index.get_closest_words, targets)
+
+  with capsys.disabled():
+    benchmark_utils.report(pytestconfig, 'text_utils.fuzzy_search.FuzzyIndex.get_closest_words', result)
@@ -0,0 +1,46 @@
+import random
+import timeit
+
+from untitled_api.libs.text_utils.formatting.text_formatter import only_alpha_numeric
+from untitled_api.libs.text_utils.parsers import text_parser
+from untitled_api.libs.text_utils.search.keyword_search import get_keyword_matcher
+
+words = ['doorman', 'laundry', 'elevator', 'dishwasher', 'hardwood', 'floors', 'roof', 'deck', 'gym', 'pets', 'ok',
+         'washer', 'dryer', 'in', 'unit', 'central', 'air', 'sunny', 'bright', 'renovated', 'kitchen', 'bath']
+
+
+def _legacy_get_canonical_name_from_keywords(content, keywords):
+  # get_canonical_name_from_keywords before it used a KeywordMatcher, kept as a reference
+  ret_val = set()
+
+  content_alnum = only_alpha_numeric(content).lower()
+  content_words = [only_alpha_numeric(x) for x in content.lower().split()]
+
+  for k, v in list(keywords.items()):
+    if " " in k:
+      if only_alpha_numeric(k).lower() in content_alnum:
+        ret_val.add(v)
+    elif only_alpha_numeric(k).lower() in content_words:
+      ret_val.add(v)
+
+  return ret_val
+
+
+def test_keyword_matching_throughput(capsys):
+  rnd = random.Random(0)
+  keywords = {' '.join(rnd.choice(words) for _ in range(rnd.randint(1, 3))) + str(i % 3 or ''): i for i in range(500)}
+  listings = [' '.join(rnd.choice(words) for _ in range(120)) for _ in range(1000)]
+
+  assert [_legacy_get_canonical_name_from_keywords(l, keywords) for l in listings] == \
+         [set(get_keyword_matcher(keywords).match(l)) for l in listings]
+
+  legacy_seconds = timeit.timeit(lambda: [_legacy_get_canonical_name_from_keywords(l, keywords) for l in listings],
+                                 number=1)
+  seconds = timeit.timeit(lambda: [text_parser.get_canonical_name_from_keywords(l, keywords) for l in listings],
+                          number=1)
+
+  with capsys.disabled():
+    print('\ntext_parser.get_canonical_name_from_keywords, 500 keywords: {0:,.0f} listings/s'.format(
+      len(listings) / seconds))
+    print('legacy get_canonical_name_from_keywords, 500 keywords: {0:,.0f} listings/s'.format(
+      len(listings) / legacy_seconds))
@@ -0,0 +1,74 @@
+import html.entities
+import re
+import timeit
+
+from untitled_api.libs.text_utils.formatting import text_formatter
+
+listing_body = (
+  'Sunny 2 bedroom apartment at 248 E 2nd Street. Hardwood floors, new appliances &amp; a large bathtub. '
+  'No fee! Pets are permitted in the building... call 646-597-6005 to view, or email f o o @ b a r . c o m '
+) * 20
+
+
+def _legacy_unescape(text):
+  # unescape before its pattern was precompiled, kept as a reference
+  def fixup(m):
+    text = m.group(0)
+    if text[:2] == '&#':
+      try:
+        if text[:3] == '&#x':
+          return chr(int(text[3:-1], 16))
+        else:
+          return chr(int(text[2:-1]))
+      except ValueError:
+        pass
+    else:
+      try:
+        text = chr(html.entities.name2codepoint[text[1:-1]])
+      except KeyError:
+        pass
+    return text
+
+  return re.sub(r'&#?\w+;', fixup, text)
+
+
+def _legacy_despacify(text):
+  def fixup(m):
+    text = m.group(0)
+    return ' ' + ''.join(text.split()) + ' '
+
+  return re.sub(r'((?:\s\S){3,})\s', fixup, text)
+
+
+def _legacy_decode_js(text):
+  def fixup(m):
+    return ''.join(chr(int(point)) for point in m.group(1).split(','))
+
+  return re.sub(r'fromCharCode\((.+)\)', fixup, text)
+
+
+def _legacy_only_alpha_numeric(content):
+  return ''.join(x for x in content if x.isalnum())
+
+
+def _ns_per_char(function, text):
+  seconds = min(timeit.repeat(lambda: function(text), number=200, repeat=3)) / 200
+  return seconds * 1e9 / len(text)
+
+
+def test_text_formatter_ns_per_char(capsys):
+  functions = [
+    ('only_alpha_numeric', text_formatter.only_alpha_numeric, _legacy_only_alpha_numeric),
+    ('unescape', text_formatter.unescape, _legacy_unescape),
+    ('despacify', text_formatter.despacify, _legacy_despacify),
+    ('decodeJs', text_formatter.decodeJs, _legacy_decode_js),
+  ]
+
+  for name, function, legacy_function in functions:
+    assert legacy_function(listing_body) == function(listing_body)
+
+  with capsys.disabled():
+    print()
+    for name, function, legacy_function in functions:
+      print('text_formatter.{0}: {1:.1f} ns/char, legacy {2:.1f} ns/char'.format(
+        name, _ns_per_char(function, listing_body), _ns_per_char(legacy_function, listing_body)))
@@ -0,0 +1,15 @@
+from untitled_api.libs.housing_utils.tests import listing_corpus
+from untitled_api.libs.python_utils.testing import benchmark_utils
+from untitled_api.libs.text_utils.parsers import text_parser
+
+
+def test_get_canonical_name_from_keywords_against_baseline(capsys, pytestconfig):
+  listings = listing_corpus.generate_listings(10000)
+
+  result = benchmark_utils.measure(
+    lambda body: text_parser.get_canonical_name_from_keywords(body, listing_corpus.amenity_keywords),
+    [l.body for l in listings]
+  )
+
+  with capsys.disabled():
+    benchmark_utils.report(pytestconfig, 'text_utils.text_parser.get_canonical_name_from_keywords', result)
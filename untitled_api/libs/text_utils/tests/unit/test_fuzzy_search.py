@@ -1,5 +1,8 @@
+import difflib
 import pytest
+from untitled_api.libs.python_utils.collections.lru_cache import LRUCache
 from untitled_api.libs.text_utils.search import fuzzy_search
+from untitled_api.libs.text_utils.search.fuzzy_search import FuzzyIndex, FuzzyMatch
 
 
 @pytest.mark.parametrize(('target', 'sources', 'expected'), [
@@ -8,3 +11,50 @@ from untitled_api.libs.text_utils.search import fuzzy_search
 def test_fuzzy_parser_gets_closest_source(target, sources, expected):
   actual = fuzzy_search.get_closest_word(target, sources)
   assert expected == actual
+
+
+@pytest.mark.parametrize(('target', 'k', 'expected'), [
+  ('organ', 1, [FuzzyMatch('organ', 1.0)]),
+  ('orgen', 2, [FuzzyMatch('organ', 0.8), FuzzyMatch('organize', 8 / 13.0)]),
+  ('xyz', 1, [FuzzyMatch('organize', 2 / 11.0)]),
+  ('organ', 10, [FuzzyMatch('organ', 1.0), FuzzyMatch('organize', 10 / 13.0), FuzzyMatch('organization', 10 / 17.0)]),
+])
+def test_fuzzy_index_gets_closest_sources(target, k, expected):
+  index = FuzzyIndex(['organize', 'organization', 'organ', 'organize'])
+  assert expected == index.get_closest_words(target, k)
+
+
+@pytest.mark.parametrize('target', ['aprtment', 'part', '', 'zzz'])
+def test_fuzzy_index_matches_sequence_matcher(target):
+  sources = ['apartment', 'apartments', 'department', 'compartment', 'partner', 'a', '']
+  scores = [difflib.SequenceMatcher(a=s, b=target).ratio() for s in sources]
+  # best first, ties in source order
+  expected = [FuzzyMatch(sources[i], scores[i]) for i in sorted(range(len(sources)), key=lambda i: -scores[i])[:3]]
+
+  assert expected == FuzzyIndex(sources).get_closest_words(target, 3)
+
+
+def test_fuzzy_parser_caches_closest_source():
+  cache = LRUCache()
+  sources = ['organize', 'organization']
+
+  assert 'organize' == fuzzy_search.get_closest_word('organ', sources, cache, 1)
+  assert 'organize' == fuzzy_search.get_closest_word('ORGAN', sources, cache, 1)
+  assert 'organization' == fuzzy_search.get_closest_word('organization', sources, cache, 1)
+  assert 'organ' == fuzzy_search.get_closest_word('organ', ['organ', 'organization'], cache, 2)
+  assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_fuzzy_parser_requires_a_vocabulary_version_with_a_cache():
+  with pytest.raises(ValueError):
+    fuzzy_search.get_closest_word('organ', ['organize'], LRUCache())
+
+
+def test_fuzzy_index_caches_closest_sources():
+  cache = LRUCache()
+  index = FuzzyIndex(['organize', 'organization'], cache=cache)
+  other_index = FuzzyIndex(['organ'], cache=cache)
+
+  assert index.get_closest_words('organ') == index.get_closest_words('organ')
+  assert [FuzzyMatch('organ', 1.0)] == other_index.get_closest_words('organ')
+  assert (cache.hits, cache.misses) == (1, 2)
@@ -0,0 +1,57 @@
+import pytest
+from untitled_api.libs.text_utils.search import keyword_search
+from untitled_api.libs.text_utils.search.keyword_search import KeywordMatcher
+
+
+@pytest.mark.parametrize(("content", "keywords", "expected"), [
+  ('hi how are you', {'hi': 1}, {1: True}),
+  ('High ceilings', {'hi': 1}, {}),
+  ('Dogs, cats OK!', {'cats': 1, 'DOGS': 2, 'birds': 3}, {1: True, 2: True}),
+  ('this foo bar is so dumb', {'foo bar': 1}, {1: True}),
+  ('this foobar is so dumb', {'foo bar': 1}, {1: True}),
+  ('in-unit washer/dryer', {'washer dryer': 1, 'in unit': 2, 'unit washer': 3}, {1: True, 2: True, 3: True}),
+  ('a b c a b d', {'a b d': 1, 'b c a': 2, 'c a d': 3}, {1: True, 2: True}),
+  ('aaab', {'a a b': 1, 'a a a a': 2}, {1: True}),
+  ('anything', {'  ': 1}, {1: True}),
+  ('', {'foo bar': 1, 'foo': 2}, {}),
+])
+def test_keyword_matcher_matches_keywords(content, keywords, expected):
+  assert expected == KeywordMatcher(keywords).match(content)
+
+
+@pytest.mark.parametrize(("content", "expected"), [
+  ('No dogs allowed', {1: False}),
+  ('Sorry, no cats or dogs. Washer/dryer in unit', {1: False, 2: False, 3: True}),
+  ('Dogs are not allowed, cats ok', {1: False, 2: True}),
+  ('dogs and cats OK but no cats over 20 lbs', {1: True, 2: True}),
+  ('No broker fee - dogs ok', {1: True}),
+  ('Building without washer dryer, dogs welcome', {1: True, 3: False}),
+  ('no fee. cats and dogs welcome', {1: True, 2: True}),
+])
+def test_keyword_matcher_detects_negated_keywords(content, expected):
+  keywords = {'dogs': 1, 'cats': 2, 'washer dryer': 3}
+  assert expected == KeywordMatcher(keywords).match(content)
+
+
+@pytest.mark.parametrize(("content", "expected"), [
+  ('No fee apartment', {1: True}),
+  ('Not a no fee apartment', {1: False}),
+  ('Non smoking building, dogs ok', {2: True, 3: True}),
+  ('Sorry, this is not a non smoking building', {2: False}),
+  ('No fee dogs ok', {1: True, 3: True}),
+  ('Washer dryer not included', {4: False}),
+])
+def test_keyword_matcher_does_not_negate_a_phrase_with_its_own_negation(content, expected):
+  keywords = {'no fee': 1, 'non smoking': 2, 'dogs': 3, 'washer dryer': 4}
+  assert expected == KeywordMatcher(keywords).match(content)
+
+
+def test_keyword_matcher_is_reused_for_the_same_keywords():
+  keywords = {'foo': 1}
+  matcher = keyword_search.get_keyword_matcher(keywords)
+
+  assert matcher is keyword_search.get_keyword_matcher(keywords)
+
+  keywords['bar'] = 2
+  assert matcher is keyword_search.get_keyword_matcher(keywords)
+  assert {2: True} == keyword_search.get_keyword_matcher(keywords, keywords_version=2).match('bar')
@@ -0,0 +1,38 @@
+import pytest
+from untitled_api.libs.text_utils.formatting import text_formatter
+
+
+@pytest.mark.parametrize(("input_values", "expected"), [
+  ('Hello, World! 123', 'HelloWorld123'),
+  ('in_unit washer/dryer', 'inunitwasherdryer'),
+  ('Café №5 ½', 'Café5½'),
+  ('', ''),
+])
+def test_text_formatter_keeps_only_alpha_numeric(input_values, expected):
+  assert expected == text_formatter.only_alpha_numeric(input_values)
+
+
+@pytest.mark.parametrize(("input_values", "expected"), [
+  ('foo&#64;bar&#x2E;com', 'foo@bar.com'),
+  ('rock &amp; roll &nbsp;', 'rock & roll \xa0'),
+  ('&bogus; &#xZZ; & no entity', '&bogus; &#xZZ; & no entity'),
+  ('plain text', 'plain text'),
+])
+def test_text_formatter_unescapes_entities(input_values, expected):
+  assert expected == text_formatter.unescape(input_values)
+
+
+@pytest.mark.parametrize(("input_values", "expected"), [
+  ('mail f o o @ b a r . c o m now', 'mail foo@bar.com now'),
+  ('a b no spacing here', 'a b no spacing here'),
+])
+def test_text_formatter_despacifies(input_values, expected):
+  assert expected == text_formatter.despacify(input_values)
+
+
+@pytest.mark.parametrize(("input_values", "expected"), [
+  ('fromCharCode(102,111,111)', 'foo'),
+  ('no javascript', 'no javascript'),
+])
+def test_text_formatter_decodes_js(input_values, expected):
+  assert expected == text_formatter.decodeJs(input_values)
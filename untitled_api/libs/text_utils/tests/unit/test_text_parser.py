@@ -1,6 +1,8 @@
 import pytest
+from untitled_api.libs.python_utils.collections.lru_cache import LRUCache
 from untitled_api.libs.text_utils.parsers import text_parser
 from untitled_api.libs.text_utils.parsers.text_parser import CanonicalNameResult
+from untitled_api.libs.text_utils.search.keyword_search import KeywordMatcher
 
 
 @pytest.mark.parametrize(("input_values", "keywords", "expected"), [
@@ -10,3 +12,32 @@ from untitled_api.libs.text_utils.parsers.text_parser import CanonicalNameResult
 ])
 def test_text_parser_detects_correct_keywords(input_values, keywords, expected):
   assert expected == text_parser.get_canonical_name_from_keywords(input_values, keywords)
+
+
+def test_text_parser_accepts_a_keyword_matcher():
+  matcher = KeywordMatcher({'foo bar': 1, 'baz': 2})
+  assert [CanonicalNameResult(1, True)] == text_parser.get_canonical_name_from_keywords('foo bar!', matcher)
+
+
+def test_text_parser_recompiles_keywords_for_a_new_version():
+  keywords = {'foo': 1}
+  assert [CanonicalNameResult(1, True)] == text_parser.get_canonical_name_from_keywords('foo bar', keywords)
+
+  keywords['bar'] = 2
+  results = text_parser.get_canonical_name_from_keywords('foo bar', keywords, keywords_version=2)
+  assert {CanonicalNameResult(1, True), CanonicalNameResult(2, True)} == set(results)
+
+
+def test_text_parser_detects_negated_keywords():
+  results = text_parser.get_canonical_name_from_keywords('No dogs allowed, cats ok', {'dogs': 1, 'cats': 2})
+  assert {CanonicalNameResult(1, False), CanonicalNameResult(2, True)} == set(results)
+
+
+def test_text_parser_caches_normalized_content():
+  cache = LRUCache()
+  keywords = {'foo bar': 1}
+
+  assert [CanonicalNameResult(1, True)] == text_parser.get_canonical_name_from_keywords('foo bar', keywords, cache)
+  assert [CanonicalNameResult(1, True)] == text_parser.get_canonical_name_from_keywords(' FOO  bar', keywords, cache)
+  assert [] == text_parser.get_canonical_name_from_keywords('foo', keywords, cache)
+  assert (cache.hits, cache.misses) == (1, 2)
@@ -223,6 +223,7 @@ LOCAL_APPS = (
   'untitled_api.libs.common_domain',
   'untitled_api.libs.communication_utils',
   'untitled_api.libs.django_utils',
+  'untitled_api.libs.geo_utils',
 )
 
 # See: https://docs.djangoproject.com/en/dev/ref/settings/#installed-apps
@@ -291,8 +292,30 @@ SEARCH_BODY_REPLY_TEMPLATE = environ.get('SEARCH_BODY_REPLY_TEMPLATE', 'Hi{% if
 # these domains, like CL, will not work if you attach the result id to the "from" address because we cannot
 # reliably use a service like sendgrid to send emails - we instead might need individual email addresses
 BODY_RESULT_IDENTIFIER_DOMAINS = ('hous.craigslist.org', 'reply.craigslist.org')
+# sendgrid suggests keeping x-smtpapi recipient lists to 1000 addresses per request
+OUTBOUND_EMAIL_BATCH_SIZE = int(environ.get('OUTBOUND_EMAIL_BATCH_SIZE', 1000))
+# inbound parse bursts are written in chunks of this many rows, which keeps IN lookups under sqlite's 999 parameters
+INCOMING_EMAIL_BATCH_SIZE = int(environ.get('INCOMING_EMAIL_BATCH_SIZE', 500))
 ########## END EMAIL CONFIGURATION
 
+########### GEOCODE CONFIGURATION
+# an address doesn't move, so geocoded addresses are kept for a month. Addresses google couldn't geocode are tried
+# again after a day.
+GEOCODE_CACHE_TIMEOUT = int(environ.get('GEOCODE_CACHE_TIMEOUT', 60 * 60 * 24 * 30))
+GEOCODE_FAILURE_CACHE_TIMEOUT = int(environ.get('GEOCODE_FAILURE_CACHE_TIMEOUT', 60 * 60 * 24))
+# addresses kept in each process in front of the CACHES entry named by GEOCODE_CACHE_ALIAS
+GEOCODE_CACHE_MAX_SIZE = int(environ.get('GEOCODE_CACHE_MAX_SIZE', 10000))
+GEOCODE_CACHE_ALIAS = environ.get('GEOCODE_CACHE_ALIAS', 'default')
+# also keep geocoded addresses in the GeocodedAddress table, which survives cache evictions and flushes
+GEOCODE_CACHE_USE_DB = environ.get('GEOCODE_CACHE_USE_DB', '').lower() == 'true'
+# geocode_many stays under google's queries per second limit with this many threads. When google says we're over
+# the limit anyway, every thread waits GEOCODE_OVER_LIMIT_BACKOFF seconds, doubling on each retry of the address.
+GEOCODE_QUERIES_PER_SECOND = float(environ.get('GEOCODE_QUERIES_PER_SECOND', 5))
+GEOCODE_MAX_WORKERS = int(environ.get('GEOCODE_MAX_WORKERS', 4))
+GEOCODE_OVER_LIMIT_RETRIES = int(environ.get('GEOCODE_OVER_LIMIT_RETRIES', 3))
+GEOCODE_OVER_LIMIT_BACKOFF = float(environ.get('GEOCODE_OVER_LIMIT_BACKOFF', 2))
+########## END GEOCODE CONFIGURATION
+
 ########### REST CONFIGURATION
 REST_FRAMEWORK = {
   # 'DEFAULT_PERMISSION_CLASSES': ('rest_framework.permissions.IsAdminUser',),